@@ -1,27 +1,124 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import json
 import re
 import time
-from typing import Any, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Tuple
 
 from json_repair import repair_json
 
+try:
+    import orjson
+
+    _fast_json_loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json is the fallback.
+    _fast_json_loads = json.loads
+
 from src.common.logger import get_logger
 from src.plugin_system import ActionActivationType, BaseAction
+from src.plugin_system.apis import llm_api
 
 from .client import AstrBookClient
 from .memory import ForumMemory
 from .model_slots import resolve_model_slot
+from .prompting import build_forum_persona_block, normalize_plain_text
 from .service import AstrBookService, get_astrbook_service
-from .tools import VALID_CATEGORIES
+from .tools import CATEGORY_DISPLAY_NAMES, VALID_CATEGORIES, VALID_CATEGORY_SET
 
 logger = get_logger("astrbook_forum_actions")
 
 
 _RECENT_LIKE_ACTIONS: dict[tuple[str, str, int], float] = {}
 _LIKE_ACTION_DEDUPE_WINDOW_SEC = 8.0
+# Thread lookups shared by back-to-back actions (the planner often chains read -> reply).
+_THREAD_LOOKUP_CACHE_TTL_SEC = 20.0
+# Entries are (timestamp, client.thread_list_version, value); a create/delete through the client bumps the version.
+_LATEST_CANDIDATES_CACHE: dict[str | None, tuple[float, int, list[dict[str, Any]]]] = {}
+_TITLE_RESOLVE_CACHE: dict[tuple[str, str | None], tuple[float, int, int]] = {}
+# Auto-generated reply drafts keyed by (request_type, model slot, prompt digest); bounded LRU with a TTL.
+# Entries are dropped once posted, so only a retry after a failed post reuses a draft.
+_RECENT_DRAFTS: OrderedDict[tuple[str, str, bytes], tuple[float, str]] = OrderedDict()
+_RECENT_DRAFTS_MAX_ITEMS = 64
+_RECENT_DRAFTS_TTL_SEC = 120.0
+_FALLBACK_PROBE_CONCURRENCY = 4
+
+_EXPLICIT_ID_RES = (
+    re.compile(r"(?:thread_id|reply_id)\s*[:=：]\s*(\d+)", re.IGNORECASE),
+    re.compile(r"(?:threadid|replyid)\s*[:=：]\s*(\d+)", re.IGNORECASE),
+)
+_URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+_STANDALONE_INT_RE = re.compile(r"(?<![A-Za-z0-9])(\d+)(?![A-Za-z0-9])")
+
+_LOOKUP_DETERMINER_RE = re.compile(r"^(?:一个|一下|一位|某个|某位|这个|那个)")
+_LOOKUP_NAME_PREFIX_RE = re.compile(r"^(?:用户名|用户|昵称|名字)\s*(?:叫|是|为)?")
+_LOOKUP_VERB_PREFIX_RE = re.compile(r"^(?:叫|是|为)")
+_LOOKUP_BOT_SUFFIX_RE = re.compile(r"(?:的)?(?:bot|机器人)$", re.IGNORECASE)
+_FOLLOW_KEYWORD_RES = (
+    re.compile(r"(?:用户名|昵称|名字)\s*(?:叫|是|为|[:=：])\s*([^\s,，。!！?？]+)", re.IGNORECASE),
+    re.compile(r"@([A-Za-z0-9_\-\u4e00-\u9fff]{1,32})", re.IGNORECASE),
+    re.compile(r"(?:关注|取关|取消关注|follow|unfollow)\s*(?:用户)?\s*([^\s,，。!！?？]+)", re.IGNORECASE),
+)
+
+_THREAD_TARGET_RES = (
+    re.compile(r"(?:thread_id|threadid)\s*[:=：]\s*(\d+)", re.IGNORECASE),
+    re.compile(r"(?:帖子|贴子|主题)\s*(?:id|ID)?\s*[:=：]?\s*(\d+)", re.IGNORECASE),
+    re.compile(r"(\d+)\s*号?\s*(?:帖子|贴子|主题)", re.IGNORECASE),
+)
+_REPLY_TARGET_RES = (
+    re.compile(r"(?:reply_id|replyid)\s*[:=：]\s*(\d+)", re.IGNORECASE),
+    re.compile(r"(?:回复|楼层|楼中楼)\s*(?:id|ID)?\s*[:=：]?\s*(\d+)", re.IGNORECASE),
+    re.compile(r"(\d+)\s*号?\s*(?:回复|楼层|楼中楼)", re.IGNORECASE),
+)
+_COMMON_TARGET_RES = (
+    re.compile(r"(?:target_id|targetid)\s*[:=：]\s*(\d+)", re.IGNORECASE),
+    re.compile(r"\bid\s*[:=：]\s*(\d+)", re.IGNORECASE),
+)
+# Pattern lists per target_type, assembled once instead of on every lookup.
+_TARGET_RES_BY_TYPE = {
+    "thread": (*_THREAD_TARGET_RES, *_COMMON_TARGET_RES),
+    "reply": (*_REPLY_TARGET_RES, *_COMMON_TARGET_RES),
+}
+_ANY_TARGET_RES = (*_THREAD_TARGET_RES, *_REPLY_TARGET_RES, *_COMMON_TARGET_RES)
+
+# Intent keywords show up near the start of a request; cap the scan so long pastes stay cheap.
+_INTENT_SCAN_CHARS = 200
+# Titles may run up to 120 chars, so leave room for one that starts inside the intent window.
+_TITLE_SCAN_CHARS = _INTENT_SCAN_CHARS + 128
+
+_AUTO_REPLY_LITERALS = ("自动", "自主", "你来", "你自己")
+_AUTO_REPLY_COMPOUND_RE = re.compile(r"帮我.*(生成|写|拟|回复)|根据.*(内容|上下文).*回复")
+_LATEST_THREAD_LITERALS = ("最新", "最近")
+_LATEST_EN_RE = re.compile(r"latest", re.IGNORECASE)
+_LATEST_THREAD_RE = re.compile(r"(最新|最近|latest).{0,8}(帖子|贴子|一帖|一贴|主题|帖子们|帖子呢)", re.IGNORECASE)
+# Whitespace (every str.isspace() code point lives below U+3001) and quotes dropped by _normalize_title.
+_TITLE_STRIP_TABLE = dict.fromkeys(
+    [cp for cp in range(0x3001) if chr(cp).isspace()] + [ord(ch) for ch in "“”\"'‘’"],
+    None,
+)
+_BOOK_TITLE_RE = re.compile(r"《([^》]{2,120})》")
+_TITLE_KV_RE = re.compile(r"(?:标题|title)\s*[:=：]\s*([^\n]{2,120})", re.IGNORECASE)
+_READ_VERB_RE = re.compile(r"(?:回复|回帖|回贴|查看|阅读|读帖|读贴|看帖|看贴)\s+([^\n]{2,120})")
+# Single-scan gate: most messages carry no title at all, so rule that out before the ordered lookups.
+_ANY_TITLE_RE = re.compile(
+    "|".join(p.pattern for p in (_BOOK_TITLE_RE, _TITLE_KV_RE, _READ_VERB_RE)),
+    re.IGNORECASE,
+)
+# Parameter-like fragments that disqualify a phrase from being treated as a thread title.
+_PARAM_MARKERS = ("thread_id", "reply_id", "content=")
+_BROWSE_LINE_RE = re.compile(r"^\[(\d+)\]\s*(?:\[[^\]]+\]\s*)?(.*)$")
+_ID_LINE_RE = re.compile(r"\bID[:：]\s*(\d+)\b", re.IGNORECASE)
+
+_UNFOLLOW_INTENT_RE = re.compile(r"(取消关注|取关|unfollow)", re.IGNORECASE)
+_FOLLOWERS_INTENT_RE = re.compile(r"(粉丝|followers)", re.IGNORECASE)
+_REPLY_TARGET_INTENT_RE = re.compile(r"(回复|楼层|楼中楼|reply)", re.IGNORECASE)
+_THREAD_TARGET_INTENT_RE = re.compile(r"(帖子|贴子|thread|主题)", re.IGNORECASE)
+_SEARCH_USERS_PREFIX_RE = re.compile(r"^(查用户|搜索用户|搜用户)\s*")
+_FETCH_DETAILS_INTENT_RE = re.compile(r"(详情|列表|全部|fetch|read)", re.IGNORECASE)
 
 
 def _cleanup_recent_like_actions(now: float) -> None:
@@ -34,29 +131,90 @@ def _cleanup_recent_like_actions(now: float) -> None:
         del _RECENT_LIKE_ACTIONS[key]
 
 
+def _cleanup_thread_lookup_caches(now: float) -> None:
+    for cache in (_LATEST_CANDIDATES_CACHE, _TITLE_RESOLVE_CACHE):
+        expired = [key for key, (ts, _, _) in cache.items() if now - ts > _THREAD_LOOKUP_CACHE_TTL_SEC]
+        for key in expired:
+            del cache[key]
+
+
+def _draft_cache_key(request_type: str, slot_name: str, prompt: str) -> tuple[str, str, bytes]:
+    return request_type, slot_name, hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+
+
+def _get_cached_draft(key: tuple[str, str, bytes]) -> str | None:
+    entry = _RECENT_DRAFTS.get(key)
+    if entry is None:
+        return None
+    ts, draft = entry
+    if time.time() - ts > _RECENT_DRAFTS_TTL_SEC:
+        del _RECENT_DRAFTS[key]
+        return None
+    _RECENT_DRAFTS.move_to_end(key)
+    return draft
+
+
+def _remember_draft(key: tuple[str, str, bytes], draft: str) -> None:
+    _RECENT_DRAFTS[key] = (time.time(), draft)
+    _RECENT_DRAFTS.move_to_end(key)
+    while len(_RECENT_DRAFTS) > _RECENT_DRAFTS_MAX_ITEMS:
+        _RECENT_DRAFTS.popitem(last=False)
+
+
+def _discard_draft(content: str) -> None:
+    """Forget a draft after it was posted so a repeated request drafts a fresh reply."""
+
+    for key in [key for key, (_, draft) in _RECENT_DRAFTS.items() if draft == content]:
+        del _RECENT_DRAFTS[key]
+
+
 def _coerce_int(value: Any) -> int | None:
-    if isinstance(value, int):
+    value_type = type(value)
+    if value_type is int:
         return value
-    if isinstance(value, float):
+    if value_type is bool or value_type is float:
         return int(value)
-    if isinstance(value, str):
+    if value_type is str:
+        # Only plain non-negative digits: signs/underscores (accepted by int()) must not yield ids/pages.
         s = value.strip()
-        if s.isdigit():
+        if not s.isdigit():
+            return None
+        try:
             return int(s)
+        except ValueError:  # non-ASCII digits such as "²"
+            return None
     return None
 
 
+def _get_str(data: dict[str, Any], *keys: str, default: str = "") -> str:
+    """Return the first truthy `data[key]` among keys as a stripped string, else `default`."""
+
+    for key in keys:
+        value = data.get(key)
+        if value:
+            return (value if type(value) is str else str(value)).strip()
+    return default
+
+
+_TRUE_STRINGS = frozenset({"1", "true", "yes", "y", "on"})
+_FALSE_STRINGS = frozenset({"0", "false", "no", "n", "off"})
+
+
 def _coerce_bool(value: Any) -> bool | None:
-    if isinstance(value, bool):
+    value_type = type(value)
+    if value_type is bool:
         return value
-    if isinstance(value, (int, float)):
-        return bool(value)
-    if isinstance(value, str):
+    if value is None:
+        return None
+    if value_type is str:
         s = value.strip().lower()
-        if s in {"1", "true", "yes", "y", "on"}:
+        if s in _TRUE_STRINGS:
             return True
-        if s in {"0", "false", "no", "n", "off"}:
+        if s in _FALSE_STRINGS:
             return False
+        return None
+    if isinstance(value, (int, float)):
+        return bool(value)
     return None
 
 
@@ -72,11 +230,8 @@ def _extract_first_int(text: str) -> int | None:
         return None
 
     # Prefer explicit param patterns first.
-    for pat in (
-        r"(?:thread_id|reply_id)\s*[:=：]\s*(\d+)",
-        r"(?:threadid|replyid)\s*[:=：]\s*(\d+)",
-    ):
-        m = re.search(pat, text, flags=re.IGNORECASE)
+    for pattern in _EXPLICIT_ID_RES:
+        m = pattern.search(text)
         if m:
             try:
                 return int(m.group(1))
@@ -84,10 +239,10 @@ def _extract_first_int(text: str) -> int | None:
                 pass
 
     # Strip URLs to avoid accidental matches in links.
-    text = re.sub(r"https?://\S+", " ", text, flags=re.IGNORECASE)
+    text = _URL_RE.sub(" ", text)
 
     # Match numbers that are not adjacent to ASCII alphanumerics (avoid BV13xxxx, abc123def, etc).
-    m = re.search(r"(?<![A-Za-z0-9])(\d+)(?![A-Za-z0-9])", text)
+    m = _STANDALONE_INT_RE.search(text)
     if not m:
         return None
     try:
@@ -101,12 +256,12 @@ def _normalize_user_lookup_keyword(text: str) -> str:
     if not keyword:
         return ""
 
-    keyword = re.sub(r"^(?:一个|一下|一位|某个|某位|这个|那个)", "", keyword)
-    keyword = re.sub(r"^(?:用户名|用户|昵称|名字)\s*(?:叫|是|为)?", "", keyword)
-    keyword = re.sub(r"^(?:叫|是|为)", "", keyword)
+    keyword = _LOOKUP_DETERMINER_RE.sub("", keyword)
+    keyword = _LOOKUP_NAME_PREFIX_RE.sub("", keyword)
+    keyword = _LOOKUP_VERB_PREFIX_RE.sub("", keyword)
     keyword = keyword.strip()
 
-    keyword = re.sub(r"(?:的)?(?:bot|机器人)$", "", keyword, flags=re.IGNORECASE).strip()
+    keyword = _LOOKUP_BOT_SUFFIX_RE.sub("", keyword).strip()
     keyword = keyword.strip("，。,.!?！？；;:：'\"“”‘’ ")
     return keyword
 
@@ -116,13 +271,8 @@ def _extract_user_keyword_for_follow(text: str) -> str | None:
     if not text:
         return None
 
-    patterns = (
-        r"(?:用户名|昵称|名字)\s*(?:叫|是|为|[:=：])\s*([^\s,，。!！?？]+)",
-        r"@([A-Za-z0-9_\-\u4e00-\u9fff]{1,32})",
-        r"(?:关注|取关|取消关注|follow|unfollow)\s*(?:用户)?\s*([^\s,，。!！?？]+)",
-    )
-    for pat in patterns:
-        m = re.search(pat, text, flags=re.IGNORECASE)
+    for pattern in _FOLLOW_KEYWORD_RES:
+        m = pattern.search(text)
         if not m:
             continue
         keyword = _normalize_user_lookup_keyword(m.group(1))
@@ -151,8 +301,8 @@ def _pick_user_candidate_by_keyword(items: Any, keyword: str) -> dict[str, Any]
         if user_id is None:
             continue
 
-        username = str(item.get("username", "") or "").strip()
-        nickname = str(item.get("nickname", "") or "").strip()
+        username = _get_str(item, "username")
+        nickname = _get_str(item, "nickname")
         normalized_names = {
             _normalize_user_lookup_keyword(username).lower(),
             _normalize_user_lookup_keyword(nickname).lower(),
@@ -189,7 +339,7 @@ def _format_user_candidates(items: Any, *, limit: int = 5) -> str:
         if user_id is None:
             continue
         username = str(item.get("username", "未知用户") or "未知用户")
-        nickname = str(item.get("nickname", "") or "").strip()
+        nickname = _get_str(item, "nickname")
         display_name = nickname or username
         lines.append(f"- {display_name} (@{username})，user_id={user_id}")
         shown += 1
@@ -214,31 +364,8 @@ def _extract_target_id_from_text(text: str, *, target_type: str | None = None) -
         return None
 
     target = str(target_type or "").strip().lower()
-
-    thread_patterns = (
-        r"(?:thread_id|threadid)\s*[:=：]\s*(\d+)",
-        r"(?:帖子|贴子|主题)\s*(?:id|ID)?\s*[:=：]?\s*(\d+)",
-        r"(\d+)\s*号?\s*(?:帖子|贴子|主题)",
-    )
-    reply_patterns = (
-        r"(?:reply_id|replyid)\s*[:=：]\s*(\d+)",
-        r"(?:回复|楼层|楼中楼)\s*(?:id|ID)?\s*[:=：]?\s*(\d+)",
-        r"(\d+)\s*号?\s*(?:回复|楼层|楼中楼)",
-    )
-    common_patterns = (
-        r"(?:target_id|targetid)\s*[:=：]\s*(\d+)",
-        r"\bid\s*[:=：]\s*(\d+)",
-    )
-
-    if target == "thread":
-        patterns = (*thread_patterns, *common_patterns)
-    elif target == "reply":
-        patterns = (*reply_patterns, *common_patterns)
-    else:
-        patterns = (*thread_patterns, *reply_patterns, *common_patterns)
-
-    for pat in patterns:
-        m = re.search(pat, text, flags=re.IGNORECASE)
+    for pattern in _TARGET_RES_BY_TYPE.get(target, _ANY_TARGET_RES):
+        m = pattern.search(text)
         if not m:
             continue
         try:
@@ -250,10 +377,39 @@ def _extract_target_id_from_text(text: str, *, target_type: str | None = None) -
 
 
 def _truncate(text: str, max_chars: int) -> str:
-    text = str(text or "")
+    if not text:
+        return ""
+    if type(text) is not str:
+        text = str(text)
     if max_chars <= 0 or len(text) <= max_chars:
         return text
-    return text[: max_chars - 1] + "…"
+    return f"{text[: max_chars - 1]}…"
+
+
+_THREAD_TEXT_MAX_CHARS = 3800
+_THREAD_TEXT_KEEP_CHARS = 3770
+_THREAD_TEXT_TRUNCATED_SUFFIX = "…\n\n（内容较长，已截断；可通过 page 参数查看更多楼层。）"
+
+# Static instructions of the auto-reply prompts. They sit right after the persona/profile blocks
+# so the per-call context comes last and providers with prefix caching can reuse the head.
+_REPLY_THREAD_PROMPT_RULES = """用户希望你在 AstrBook 论坛回复一个帖子，请你写一段将要发布到论坛的回复（帖子内容见文末）。
+
+只输出严格 JSON（不要输出其他内容）：
+{"content":"..."}
+
+要求：
+1) content 10-400 字符，简洁有信息量，避免纯水。
+2) 直接输出要发的正文（纯文本），不要输出 Markdown 代码块/标题/多余说明。
+3) 不要出现“作为AI/作为语言模型”等措辞。"""
+_REPLY_FLOOR_PROMPT_RULES = """用户希望你在 AstrBook 论坛进行一次楼中楼回复，请你写一段将要发布到楼中楼的回复（上下文见文末）。
+
+只输出严格 JSON（不要输出其他内容）：
+{"content":"..."}
+
+要求：
+1) content 10-300 字符，简洁有信息量，避免纯水。
+2) 直接输出要发的正文（纯文本），不要输出 Markdown 代码块/标题/多余说明。
+3) 不要出现“作为AI/作为语言模型”等措辞。"""
 
 
 _NOTIFICATION_TYPE_LABELS: dict[str, str] = {
@@ -312,52 +468,92 @@ def _build_notifications_text(items: Any, total: int, *, marked_as_read: bool) -
     return "\n".join(lines)
 
 
+# LLM retries often return the exact same text; reuse the repaired string instead of re-running repair_json.
+_cached_repair_json = lru_cache(maxsize=128)(repair_json)
+
+
+# String literals are consumed whole so braces inside them don't count towards nesting.
+_JSON_SCAN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]', re.DOTALL)
+
+
+def _find_json_object_span(text: str) -> str | None:
+    """Return the first balanced `{...}` slice of text (e.g. inside code fences or after a preamble)."""
+
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    for m in _JSON_SCAN_RE.finditer(text, start):
+        token = m.group()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : m.end()]
+    return None
+
+
 def _parse_json_object(text: str) -> dict[str, Any] | None:
+    if not text:
+        return None
+    # Well-behaved models return valid JSON; only pay for repair_json when strict parsing fails.
     try:
-        fixed = repair_json(text)
-        data = json.loads(fixed)
-        return data if isinstance(data, dict) else None
+        data = _fast_json_loads(text)
     except Exception:
-        return None
+        data = None
+        # Fenced/prefixed output usually wraps a valid object; try that slice strictly first.
+        span = _find_json_object_span(text)
+        if span is not None and span != text:
+            try:
+                data = _fast_json_loads(span)
+            except Exception:
+                data = None
+        if data is None:
+            try:
+                fixed = _cached_repair_json(text)
+                try:
+                    data = _fast_json_loads(fixed)
+                except json.JSONDecodeError:  # orjson rejects a few stdlib-accepted edge cases (e.g. NaN)
+                    data = json.loads(fixed)
+            except Exception:
+                return None
+    return data if isinstance(data, dict) else None
 
 
+@lru_cache(maxsize=512)
 def _wants_auto_reply(text: str) -> bool:
     """Heuristic: whether user asks the bot to generate a reply by itself."""
 
-    text = str(text or "").strip()
+    text = str(text or "").strip()[:_INTENT_SCAN_CHARS]
     if not text:
         return False
 
-    return bool(
-        re.search(
-            r"(自动|自主|你来|你自己|帮我.*(生成|写|拟|回复)|根据.*(内容|上下文).*回复)",
-            text,
-        )
-    )
+    # Plain substring checks cover the common cases without entering the regex engine.
+    if any(k in text for k in _AUTO_REPLY_LITERALS):
+        return True
+    if "帮我" not in text and "根据" not in text:
+        return False
+    return bool(_AUTO_REPLY_COMPOUND_RE.search(text))
 
 
+@lru_cache(maxsize=512)
 def _wants_latest_thread(text: str) -> bool:
     """Heuristic: whether user asks about the latest/recent thread."""
 
-    text = str(text or "").strip()
+    text = str(text or "").strip()[:_INTENT_SCAN_CHARS]
     if not text:
         return False
 
-    return bool(
-        re.search(
-            r"(最新|最近|latest).{0,8}(帖子|贴子|一帖|一贴|主题|帖子们|帖子呢)",
-            text,
-            flags=re.IGNORECASE,
-        )
-    )
+    if not any(k in text for k in _LATEST_THREAD_LITERALS) and not _LATEST_EN_RE.search(text):
+        return False
+    return bool(_LATEST_THREAD_RE.search(text))
 
 
 def _normalize_title(text: str) -> str:
     text = str(text or "").strip().lower()
     # Remove some punctuations and whitespace for better matching.
-    text = re.sub(r"[\s\u3000]+", "", text)
-    text = re.sub(r"[“”\"'‘’]+", "", text)
-    return text
+    return text.translate(_TITLE_STRIP_TABLE)
 
 
 def _extract_thread_title(text: str) -> str | None:
@@ -367,23 +563,23 @@ def _extract_thread_title(text: str) -> str | None:
     """
 
     text = str(text or "").strip()
-    if not text:
+    if not text or not _ANY_TITLE_RE.search(text, 0, _TITLE_SCAN_CHARS):
         return None
 
-    m = re.search(r"《([^》]{2,120})》", text)
+    m = _BOOK_TITLE_RE.search(text, 0, _TITLE_SCAN_CHARS)
     if m:
         return m.group(1).strip()
 
-    m = re.search(r"(?:标题|title)\s*[:=：]\s*([^\n]{2,120})", text, flags=re.IGNORECASE)
+    m = _TITLE_KV_RE.search(text, 0, _TITLE_SCAN_CHARS)
     if m:
         return m.group(1).strip()
 
     # Fallback: try to capture the phrase after "回复/回帖/查看/阅读".
-    m = re.search(r"(?:回复|回帖|回贴|查看|阅读|读帖|读贴|看帖|看贴)\s+([^\n]{2,120})", text)
+    m = _READ_VERB_RE.search(text, 0, _TITLE_SCAN_CHARS)
     if m:
         candidate = m.group(1).strip()
         # Avoid picking obvious parameter strings like "thread_id=123".
-        if "thread_id" not in candidate and "reply_id" not in candidate and "content=" not in candidate:
+        if not any(marker in candidate for marker in _PARAM_MARKERS):
             return candidate
 
     return None
@@ -393,7 +589,7 @@ def _format_thread_candidates(items: list[dict[str, Any]], *, limit: int = 5) ->
     lines = ["找到多个匹配的帖子，请指定 thread_id（例如：回帖 thread_id=16 content=...）："]
     for item in items[: max(1, limit)]:
         tid = item.get("id")
-        title = str(item.get("title", "") or "").strip()
+        title = _get_str(item, "title")
         if isinstance(tid, int):
             lines.append(f"- {tid}: {title or '（无标题）'}")
     return "\n".join(lines)
@@ -403,39 +599,29 @@ def _extract_threads_from_browse_text(text: str, *, limit: int = 10) -> list[dic
     """Best-effort parse thread entries from browse_threads(text) output."""
 
     text = str(text or "")
+    limit = max(1, limit)
     items: list[dict[str, Any]] = []
+    # Fallback "ID: 16" style entries, appended after the primary format (collected in the same pass).
+    id_items: list[dict[str, Any]] = []
 
-    # Common format: "[16] [Tech] title ..."
     for line in text.splitlines():
         line = line.strip()
         if not line:
             continue
 
-        m = re.match(r"^\[(\d+)\]\s*(?:\[[^\]]+\]\s*)?(.*)$", line)
+        # Common format: "[16] [Tech] title ..."
+        m = _BROWSE_LINE_RE.match(line)
         if m:
-            try:
-                tid = int(m.group(1))
-            except Exception:
-                continue
-            title = (m.group(2) or "").strip()
-            items.append({"id": tid, "title": title})
-            if len(items) >= max(1, limit):
+            items.append({"id": int(m.group(1)), "title": (m.group(2) or "").strip()})
+            if len(items) >= limit:
                 return items
 
-    # Fallback: try "ID: 16" style lines.
-    for line in text.splitlines():
-        line = line.strip()
-        m = re.search(r"\bID[:：]\s*(\d+)\b", line, flags=re.IGNORECASE)
-        if not m:
-            continue
-        try:
-            tid = int(m.group(1))
-        except Exception:
-            continue
-        items.append({"id": tid, "title": line})
-        if len(items) >= max(1, limit):
-            return items
+        if len(id_items) < limit:
+            m = _ID_LINE_RE.search(line)
+            if m:
+                id_items.append({"id": int(m.group(1)), "title": line})
 
+    items.extend(id_items[: limit - len(items)])
     return items
 
 
@@ -454,6 +640,15 @@ async def _resolve_latest_thread_id(
     return (int(tid), None) if isinstance(tid, int) else (None, "无法解析最新 thread_id。")
 
 
+_THREAD_TITLE_KEYS = ("title", "thread_title")
+_THREAD_PINNED_KEYS = ("is_pinned", "pinned", "is_top", "top")
+_PINNED_EN_RE = re.compile(r"pinned", re.IGNORECASE)
+
+
+def _is_pinned_title(title: str) -> bool:
+    return "置顶" in title or _PINNED_EN_RE.search(title) is not None
+
+
 def _extract_thread_items_from_list_result(data: Any) -> list[dict[str, Any]]:
     if isinstance(data, list):
         items = data
@@ -468,37 +663,30 @@ def _extract_thread_items_from_list_result(data: Any) -> list[dict[str, Any]]:
     else:
         items = []
 
-    out: list[dict[str, Any]] = []
+    # Deduplicate by id while preserving order; build the result list directly.
+    seen: set[int] = set()
+    ordered: list[dict[str, Any]] = []
     for it in items:
         if not isinstance(it, dict):
             continue
-        tid = it.get("id", None)
+        tid = it.get("id")
         if tid is None:
-            tid = it.get("thread_id", None)
+            tid = it.get("thread_id")
         if isinstance(tid, str) and tid.isdigit():
-            try:
-                tid = int(tid)
-            except Exception:
-                tid = None
-        if not isinstance(tid, int):
+            tid = int(tid)
+        if not isinstance(tid, int) or tid in seen:
             continue
+        seen.add(tid)
 
-        title = str(it.get("title", "") or it.get("thread_title", "") or "").strip()
-        pinned = bool(it.get("is_pinned") or it.get("pinned") or it.get("is_top") or it.get("top"))
-        if "置顶" in title or "pinned" in title.lower():
-            pinned = True
-
-        out.append({"id": tid, "title": title, "pinned": pinned})
+        title = ""
+        for key in _THREAD_TITLE_KEYS:
+            value = it.get(key)
+            if value:
+                title = str(value).strip()
+                break
+        pinned = any(it.get(key) for key in _THREAD_PINNED_KEYS) or _is_pinned_title(title)
 
-    # Deduplicate by id while preserving order.
-    dedup: dict[int, dict[str, Any]] = {}
-    ordered: list[dict[str, Any]] = []
-    for it in out:
-        tid = it.get("id")
-        if not isinstance(tid, int) or tid in dedup:
-            continue
-        dedup[tid] = it
-        ordered.append(it)
+        ordered.append({"id": tid, "title": title, "pinned": pinned})
     return ordered
 
 
@@ -509,6 +697,12 @@ async def _get_latest_thread_candidates(
 ) -> Tuple[list[dict[str, Any]], str | None]:
     """Get latest thread candidates from list_threads (JSON) or browse_threads(text)."""
 
+    now = time.time()
+    version = client.thread_list_version
+    cached = _LATEST_CANDIDATES_CACHE.get(category)
+    if cached is not None and cached[1] == version and now - cached[0] <= _THREAD_LOOKUP_CACHE_TTL_SEC:
+        return list(cached[2]), None
+
     items: list[dict[str, Any]] = []
 
     try:
@@ -532,27 +726,128 @@ async def _get_latest_thread_candidates(
             browse_text = str(result2.get("text") or "")
         items = _extract_threads_from_browse_text(browse_text, limit=10)
         for it in items:
-            title = str(it.get("title", "") or "")
-            if "置顶" in title or "pinned" in title.lower():
-                it["pinned"] = True
-            else:
-                it["pinned"] = False
+            it["pinned"] = _is_pinned_title(str(it.get("title", "") or ""))
 
     if not items:
         return [], "无法从帖子列表解析 thread_id，请先手动浏览帖子列表。"
 
     # Prefer non-pinned entries, and always sort by id descending as newest-first fallback.
-    non_pinned = sorted(
-        [it for it in items if not bool(it.get("pinned", False))],
-        key=lambda it: int(it.get("id", 0)),
-        reverse=True,
-    )
-    pinned = sorted(
-        [it for it in items if bool(it.get("pinned", False))],
-        key=lambda it: int(it.get("id", 0)),
-        reverse=True,
+    ordered = sorted(items, key=lambda it: (bool(it.get("pinned", False)), -int(it.get("id", 0))))
+    _cleanup_thread_lookup_caches(now)
+    _LATEST_CANDIDATES_CACHE[category] = (now, version, ordered)
+    return list(ordered), None
+
+
+def _is_not_found_error(err_text: str) -> bool:
+    return "not found" in err_text.lower() or "404" in err_text
+
+
+async def _probe_first_available_candidate(
+    probe: Callable[[int], Awaitable[dict[str, Any]]],
+    candidates: list[dict[str, Any]],
+    *,
+    skip_thread_id: int | None,
+    last_err: str,
+    concurrent: bool = True,
+) -> Tuple[int | None, dict[str, Any] | None, str]:
+    """Run `probe` on latest-thread candidates and return the first successful one in list order.
+
+    Candidates keep their newest-first preference: a later candidate is only used when every earlier
+    one is "not found". Any other error stops the probing. Only side-effect free probes (reads) may run
+    concurrently; a write must stay sequential so it lands on exactly one thread.
+    """
+
+    tids = [c.get("id") for c in candidates]
+    tids = [tid for tid in tids if isinstance(tid, int) and tid != skip_thread_id]
+    if not tids:
+        return None, None, last_err
+
+    if not concurrent:
+        for tid in tids:
+            trial = await probe(tid)
+            if "error" not in trial:
+                return tid, trial, ""
+            cand_err = str(trial.get("error") or "")
+            last_err = cand_err or last_err
+            if not _is_not_found_error(cand_err):
+                break
+        return None, None, last_err
+
+    sem = asyncio.Semaphore(_FALLBACK_PROBE_CONCURRENCY)
+
+    async def _limited(tid: int) -> dict[str, Any]:
+        async with sem:
+            return await probe(tid)
+
+    tasks = [asyncio.create_task(_limited(tid)) for tid in tids]
+    try:
+        for tid, task in zip(tids, tasks):
+            trial = await task
+            if "error" not in trial:
+                return tid, trial, ""
+
+            cand_err = str(trial.get("error") or "")
+            last_err = cand_err or last_err
+            if _is_not_found_error(cand_err):
+                continue
+            return None, None, last_err
+        return None, None, last_err
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def _retry_on_other_thread(
+    client: AstrBookClient,
+    probe: Callable[[int], Awaitable[dict[str, Any]]],
+    *,
+    thread_id: int | None,
+    err_text: str,
+    wants_latest: bool,
+    latest_candidates: list[dict[str, Any]] | None,
+    search_kw: str | None,
+    prefer_title: str | None,
+    concurrent: bool,
+) -> Tuple[int | None, dict[str, Any] | None, str, list[dict[str, Any]] | None]:
+    """Retry `probe` on another thread after `thread_id` turned out to be "not found".
+
+    Uses the latest threads when the user asked for the latest one, otherwise a title/keyword search.
+    Returns (thread_id, result, err_text, latest_candidates); thread_id/result are None if no retry worked.
+    """
+
+    if wants_latest:
+        if latest_candidates is None:
+            latest_candidates, err2 = await _get_latest_thread_candidates(client, category=None)
+            if not latest_candidates:
+                return None, None, err2 or err_text, latest_candidates
+        elif not latest_candidates:
+            return None, None, err_text, latest_candidates
+
+        tid, trial, err_text = await _probe_first_available_candidate(
+            probe,
+            latest_candidates,
+            skip_thread_id=thread_id,
+            last_err=err_text,
+            concurrent=concurrent,
+        )
+        return tid, trial, err_text, latest_candidates
+
+    if not search_kw:
+        return None, None, err_text, latest_candidates
+
+    resolved_id, err2 = await _resolve_thread_id_by_title(
+        client,
+        title_or_keyword=search_kw,
+        prefer_exact_title=prefer_title,
     )
-    return (non_pinned + pinned), None
+    if resolved_id is None or resolved_id == thread_id:
+        return None, None, err2 or err_text, latest_candidates
+
+    trial = await probe(resolved_id)
+    if "error" in trial:
+        return None, None, str(trial.get("error") or err_text), latest_candidates
+    return resolved_id, trial, "", latest_candidates
 
 
 async def _resolve_thread_id_by_title(
@@ -565,6 +860,13 @@ async def _resolve_thread_id_by_title(
     if not title_or_keyword:
         return None, "缺少帖子标题/关键词。"
 
+    now = time.time()
+    cache_key = (title_or_keyword, prefer_exact_title)
+    version = client.thread_list_version
+    cached = _TITLE_RESOLVE_CACHE.get(cache_key)
+    if cached is not None and cached[1] == version and now - cached[0] <= _THREAD_LOOKUP_CACHE_TTL_SEC:
+        return cached[2], None
+
     result = await client.search_threads(keyword=title_or_keyword, page=1, category=None)
     if "error" in result:
         return None, f"搜索帖子失败：{result['error']}"
@@ -576,35 +878,49 @@ async def _resolve_thread_id_by_title(
     if not items:
         return None, f"没有找到包含“{title_or_keyword}”的帖子。"
 
-    prefer = prefer_exact_title or title_or_keyword
+    match = _pick_title_match(items, prefer_exact_title or title_or_keyword, total=result.get("total"))
+    if match is None:
+        return None, _format_thread_candidates(items)
+
+    _cleanup_thread_lookup_caches(now)
+    _TITLE_RESOLVE_CACHE[cache_key] = (now, version, match)
+    return match, None
+
+
+def _pick_title_match(items: list[dict[str, Any]], prefer: str, *, total: Any) -> int | None:
     prefer_norm = _normalize_title(prefer)
     if prefer_norm:
-        strong_matches: list[dict[str, Any]] = []
-        for it in items:
-            t = _normalize_title(it.get("title", ""))
-            if not t:
-                continue
-            if t == prefer_norm or prefer_norm in t or t in prefer_norm:
-                strong_matches.append(it)
+        normalized = [(_normalize_title(it.get("title", "")), it) for it in items]
+        # A unique exact title wins even if other titles merely contain it.
+        exact_matches = [it for t, it in normalized if t == prefer_norm]
+        if len(exact_matches) == 1 and isinstance(exact_matches[0].get("id"), int):
+            return int(exact_matches[0]["id"])
 
+        strong_matches = [it for t, it in normalized if t and (prefer_norm in t or t in prefer_norm)]
         if len(strong_matches) == 1 and isinstance(strong_matches[0].get("id"), int):
-            return int(strong_matches[0]["id"]), None
+            return int(strong_matches[0]["id"])
 
-    if (result.get("total") == 1 or len(items) == 1) and isinstance(items[0].get("id"), int):
-        return int(items[0]["id"]), None
-
-    return None, _format_thread_candidates(items)
+    if (total == 1 or len(items) == 1) and isinstance(items[0].get("id"), int):
+        return int(items[0]["id"])
+    return None
 
 
 class _AstrBookAction(BaseAction):
     """Shared helpers for AstrBook forum actions."""
 
     def _get_service(self) -> AstrBookService:
+        # Resolve (and re-apply config) once per action instance; execute() reaches this several times.
+        svc: AstrBookService | None = getattr(self, "_astrbook_service", None)
+        if svc is not None:
+            return svc
+
         svc = get_astrbook_service()
         if svc:
             svc.update_config(self.plugin_config)
-            return svc
-        return AstrBookService(self.plugin_config)
+        else:
+            svc = AstrBookService(self.plugin_config)
+        self._astrbook_service = svc
+        return svc
 
     def _get_client(self) -> AstrBookClient:
         return self._get_service().client
@@ -662,6 +978,51 @@ class _AstrBookAction(BaseAction):
         await self.send_text("AstrBook token 未配置，请在插件配置 `astrbook.token` 中填写。")
         return False
 
+    async def _generate_reply_draft(
+        self,
+        svc: AstrBookService,
+        *,
+        prompt: str,
+        kind: str,
+        failure_label: str,
+    ) -> Tuple[str | None, str]:
+        """Draft a reply_thread/reply_floor body with the LLM; returns (draft, "") or (None, reason)."""
+
+        temperature = svc.get_config_float("realtime.reply_temperature", default=0.6, min_value=0.0, max_value=2.0)
+        max_tokens = svc.get_config_int("realtime.reply_max_tokens", default=8192, min_value=64, max_value=8192)
+
+        slot_name, model = resolve_model_slot(svc, task_key=f"llm.action_{kind}_slot")
+        request_type = f"astrbook.action.{kind}.auto"
+        # A retry after a failed post resends the identical prompt; reuse that draft instead of paying for the LLM again.
+        draft_key = _draft_cache_key(request_type, slot_name, prompt)
+        draft = _get_cached_draft(draft_key)
+        if draft is not None:
+            return draft, ""
+
+        ok, resp, _reasoning, model_name = await llm_api.generate_with_model(
+            prompt=prompt,
+            model_config=model,
+            request_type=request_type,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        if not ok:
+            logger.warning("[actions] auto %s failed: %s", kind, resp)
+            await self.send_text(f"{failure_label}：模型调用失败。")
+            return None, f"auto {kind} llm failed"
+
+        data = _parse_json_object(resp) or {}
+        draft = _get_str(data, "content")
+        if not draft:
+            draft = normalize_plain_text(resp)
+        if not draft:
+            logger.warning("[actions] auto %s invalid output model=%s: %s", kind, model_name, resp[:200])
+            await self.send_text(f"{failure_label}：模型输出解析失败。")
+            return None, f"auto {kind} invalid json"
+
+        _remember_draft(draft_key, draft)
+        return draft, ""
+
 
 class AstrBookBrowseThreadsAction(_AstrBookAction):
     action_name = "astrbook_browse_threads"
@@ -685,8 +1046,8 @@ class AstrBookBrowseThreadsAction(_AstrBookAction):
         page = _coerce_int(self.action_data.get("page")) or 1
         page_size = _coerce_int(self.action_data.get("page_size")) or 10
         page_size = max(1, min(50, page_size))
-        category = str(self.action_data.get("category", "") or "").strip() or None
-        if category and category not in VALID_CATEGORIES:
+        category = _get_str(self.action_data, "category") or None
+        if category and category not in VALID_CATEGORY_SET:
             category = None
 
         result = await self._get_client().browse_threads(page=page, page_size=page_size, category=category)
@@ -694,7 +1055,7 @@ class AstrBookBrowseThreadsAction(_AstrBookAction):
             await self.send_text(f"获取帖子列表失败：{result['error']}")
             return False, "browse_threads failed"
 
-        content = str(result.get("text") or "").strip()
+        content = _get_str(result, "text")
         if not content:
             await self.send_text("论坛帖子列表为空或返回异常。")
             return False, "empty browse_threads"
@@ -723,7 +1084,7 @@ class AstrBookSearchThreadsAction(_AstrBookAction):
         if not await self._ensure_token():
             return False, "token missing"
 
-        keyword = str(self.action_data.get("keyword", "") or "").strip()
+        keyword = _get_str(self.action_data, "keyword")
         if not keyword and self.action_message:
             keyword = str(getattr(self.action_message, "processed_plain_text", "") or "").strip()
         if not keyword:
@@ -731,8 +1092,8 @@ class AstrBookSearchThreadsAction(_AstrBookAction):
             return False, "missing keyword"
 
         page = _coerce_int(self.action_data.get("page")) or 1
-        category = str(self.action_data.get("category", "") or "").strip() or None
-        if category and category not in VALID_CATEGORIES:
+        category = _get_str(self.action_data, "category") or None
+        if category and category not in VALID_CATEGORY_SET:
             category = None
 
         result = await self._get_client().search_threads(keyword=keyword, page=page, category=category)
@@ -746,27 +1107,23 @@ class AstrBookSearchThreadsAction(_AstrBookAction):
             await self.send_text(f"没有找到包含“{keyword}”的帖子。")
             return True, "no results"
 
-        category_names = {
-            "chat": "Chat",
-            "deals": "Deals",
-            "misc": "Misc",
-            "tech": "Tech",
-            "help": "Help",
-            "intro": "Intro",
-            "acg": "ACG",
-        }
         lines = [f"🔍 Search Results for '{keyword}' ({total} found):\n"]
         for item in items if isinstance(items, list) else []:
             if not isinstance(item, dict) or "id" not in item or "title" not in item:
                 continue
-            cat = category_names.get(item.get("category"), "")
-            author = item.get("author", {}) if isinstance(item.get("author"), dict) else {}
+            cat = CATEGORY_DISPLAY_NAMES.get(item.get("category"), "")
+            author = item.get("author")
+            if not isinstance(author, dict):
+                author = {}
             author_name = author.get("nickname") or author.get("username", "Unknown")
-            lines.append(f"[{item['id']}] [{cat}] {item['title']}")
-            lines.append(f"    by @{author_name} | {item.get('reply_count', 0)} replies")
-            if item.get("content_preview"):
-                lines.append(f"    {str(item['content_preview'])[:80]}...")
-            lines.append("")
+            preview = item.get("content_preview")
+            preview_line = f"    {str(preview)[:80]}...\n" if preview else ""
+            # One block per item; the trailing newline keeps the blank separator line.
+            lines.append(
+                f"[{item['id']}] [{cat}] {item['title']}\n"
+                f"    by @{author_name} | {item.get('reply_count', 0)} replies\n"
+                f"{preview_line}"
+            )
 
         if result.get("total_pages", 1) > 1:
             lines.append(
@@ -820,7 +1177,7 @@ class AstrBookReadThreadAction(_AstrBookAction):
         if self.action_message:
             user_req = str(getattr(self.action_message, "processed_plain_text", "") or "").strip()
 
-        keyword = str(self.action_data.get("keyword", "") or "").strip()
+        keyword = _get_str(self.action_data, "keyword")
         thread_id = _coerce_int(self.action_data.get("thread_id"))
         if thread_id is None and self.action_message:
             thread_id = _extract_first_int(user_req)
@@ -866,75 +1223,40 @@ class AstrBookReadThreadAction(_AstrBookAction):
         if "error" in result:
             # Fallback: if thread_id was wrong (planner guessed), try search by title.
             err_text = str(result.get("error") or "")
-            if ("not found" in err_text.lower() or "404" in err_text) and user_req:
-                if wants_latest:
-                    if latest_candidates is None:
-                        latest_candidates, err2 = await _get_latest_thread_candidates(
-                            svc.client, category=None
-                        )
-                    else:
-                        err2 = None
-
-                    if not latest_candidates:
-                        err_text = err2 or err_text
-                    else:
-                        last_err = err_text
-                        for cand in latest_candidates:
-                            tid = cand.get("id")
-                            if not isinstance(tid, int) or tid == thread_id:
-                                continue
-
-                            trial = await svc.client.read_thread(thread_id=tid, page=page)
-                            if "error" not in trial:
-                                result = trial
-                                thread_id = tid
-                                err_text = ""
-                                break
-
-                            cand_err = str(trial.get("error") or "")
-                            last_err = cand_err or last_err
-                            if "not found" in cand_err.lower() or "404" in cand_err:
-                                continue
-
-                            err_text = cand_err or last_err
-                            break
-                        else:
-                            err_text = last_err
-                else:
-                    title = _extract_thread_title(user_req)
-                    fallback_kw = keyword or title
-                    if not fallback_kw and 2 <= len(user_req) <= 80:
-                        fallback_kw = user_req
-                    if fallback_kw:
-                        resolved_id, err2 = await _resolve_thread_id_by_title(
-                            svc.client,
-                            title_or_keyword=fallback_kw,
-                            prefer_exact_title=title,
-                        )
-                        if resolved_id is not None and resolved_id != thread_id:
-                            result = await svc.client.read_thread(thread_id=resolved_id, page=page)
-                            if "error" not in result:
-                                thread_id = resolved_id
-                                err_text = ""
-                            else:
-                                err_text = str(result.get("error") or err_text)
-                        else:
-                            err_text = err2 or err_text
+            if _is_not_found_error(err_text) and user_req:
+                title = _extract_thread_title(user_req)
+                fallback_kw = keyword or title
+                if not fallback_kw and 2 <= len(user_req) <= 80:
+                    fallback_kw = user_req
+                tid, trial, err_text, latest_candidates = await _retry_on_other_thread(
+                    svc.client,
+                    lambda tid: svc.client.read_thread(thread_id=tid, page=page),
+                    thread_id=thread_id,
+                    err_text=err_text,
+                    wants_latest=wants_latest,
+                    latest_candidates=latest_candidates,
+                    search_kw=fallback_kw,
+                    prefer_title=title,
+                    concurrent=True,
+                )
+                if tid is not None and trial is not None:
+                    result = trial
+                    thread_id = tid
 
             if "error" in result:
                 await self.send_text(f"读取帖子失败：{err_text}")
                 return False, "read_thread failed"
 
-        text = str(result.get("text") or "").strip()
+        text = _get_str(result, "text")
         if not text:
             await self.send_text("帖子内容为空或返回异常。")
             return False, "empty thread text"
 
-        if len(text) > 3800:
-            text = text[:3770] + "…\n\n（内容较长，已截断；可通过 page 参数查看更多楼层。）"
+        if len(text) > _THREAD_TEXT_MAX_CHARS:
+            text = text[:_THREAD_TEXT_KEEP_CHARS] + _THREAD_TEXT_TRUNCATED_SUFFIX
 
         await self.send_text(text)
-        self._get_memory().add_memory("browsed", f"我查看了帖子ID:{thread_id}", metadata={"thread_id": thread_id})
+        svc.memory.add_memory("browsed", f"我查看了帖子ID:{thread_id}", metadata={"thread_id": thread_id})
         return True, f"read thread {thread_id}"
 
 
@@ -977,24 +1299,19 @@ class AstrBookCreateThreadAction(_AstrBookAction):
 
         svc = self._get_service()
 
-        title = str(self.action_data.get("title", "") or "").strip()
-        content = str(self.action_data.get("content", "") or "").strip()
-        category = str(self.action_data.get("category", "chat") or "chat").strip()
-        if category not in VALID_CATEGORIES:
+        title = _get_str(self.action_data, "title")
+        content = _get_str(self.action_data, "content")
+        category = _get_str(self.action_data, "category", default="chat")
+        if category not in VALID_CATEGORY_SET:
             category = "chat"
 
         # Fallback: ask model to draft if user didn't provide title/content.
         if (not title or not content) and self.action_message:
             user_req = str(getattr(self.action_message, "processed_plain_text", "") or "").strip()
             if user_req:
-                from src.plugin_system.apis import llm_api
-
-                from .prompting import build_forum_persona_block
-
                 persona_block = build_forum_persona_block()
                 profile_block = await svc.get_profile_context_block()
-                prompt = f"""
-{persona_block}
+                prompt = f"""{persona_block}
 {profile_block}
 
 用户希望你在 AstrBook 论坛发一个新帖，但他/她的请求可能没有提供完整的标题或正文。
@@ -1009,8 +1326,7 @@ class AstrBookCreateThreadAction(_AstrBookAction):
 
 要求：
 1) title 2-100 字符
-2) content 至少 50 字符，尽量不超过 1200 字符
-""".strip()
+2) content 至少 50 字符，尽量不超过 1200 字符"""
 
                 _, draft_model = resolve_model_slot(svc, task_key="llm.action_create_thread_draft_slot")
                 ok, resp, _reasoning, model_name = await llm_api.generate_with_model(
@@ -1023,10 +1339,10 @@ class AstrBookCreateThreadAction(_AstrBookAction):
                 if ok:
                     data = _parse_json_object(resp)
                     if data:
-                        title = title or str(data.get("title", "") or "").strip()
-                        content = content or str(data.get("content", "") or "").strip()
-                        cat2 = str(data.get("category", "") or "").strip()
-                        if cat2 in VALID_CATEGORIES:
+                        title = title or _get_str(data, "title")
+                        content = content or _get_str(data, "content")
+                        cat2 = _get_str(data, "category")
+                        if cat2 in VALID_CATEGORY_SET:
                             category = cat2
                 else:
                     logger.warning("[actions] draft create_thread failed: %s", resp)
@@ -1097,8 +1413,8 @@ class AstrBookReplyThreadAction(_AstrBookAction):
         if self.action_message:
             user_req = str(getattr(self.action_message, "processed_plain_text", "") or "").strip()
 
-        keyword = str(self.action_data.get("keyword", "") or "").strip()
-        thread_title = str(self.action_data.get("thread_title", "") or "").strip()
+        keyword = _get_str(self.action_data, "keyword")
+        thread_title = _get_str(self.action_data, "thread_title")
 
         thread_id = _coerce_int(self.action_data.get("thread_id"))
         if thread_id is None and self.action_message:
@@ -1140,8 +1456,8 @@ class AstrBookReplyThreadAction(_AstrBookAction):
             await self.send_text("请提供 thread_id，或在消息里用《标题》标注帖子标题。")
             return False, "missing thread_id"
 
-        content = str(self.action_data.get("content", "") or "").strip()
-        instruction = str(self.action_data.get("instruction", "") or "").strip()
+        content = _get_str(self.action_data, "content")
+        instruction = _get_str(self.action_data, "instruction")
         auto_generate = bool(_coerce_bool(self.action_data.get("auto_generate")) or False)
 
         # Auto-generate if user didn't provide content, or user explicitly requests "you reply yourself".
@@ -1154,193 +1470,95 @@ class AstrBookReplyThreadAction(_AstrBookAction):
             thread_result = await svc.client.read_thread(thread_id=thread_id, page=1)
             if "error" in thread_result:
                 err_text = str(thread_result.get("error") or "")
-                # If planner guessed wrong id, fallback to title search once.
-                if ("not found" in err_text.lower() or "404" in err_text) and user_req:
-                    if wants_latest:
-                        if latest_candidates is None:
-                            latest_candidates, err2 = await _get_latest_thread_candidates(
-                                svc.client, category=None
-                            )
-                        else:
-                            err2 = None
-
-                        if not latest_candidates:
-                            err_text = err2 or err_text
-                        else:
-                            last_err = err_text
-                            for cand in latest_candidates:
-                                tid = cand.get("id")
-                                if not isinstance(tid, int) or tid == thread_id:
-                                    continue
-
-                                trial = await svc.client.read_thread(thread_id=tid, page=1)
-                                if "error" not in trial:
-                                    thread_id = tid
-                                    thread_result = trial
-                                    err_text = ""
-                                    break
-
-                                cand_err = str(trial.get("error") or "")
-                                last_err = cand_err or last_err
-                                if "not found" in cand_err.lower() or "404" in cand_err:
-                                    continue
-
-                                err_text = cand_err or last_err
-                                break
-                            else:
-                                err_text = last_err
-                    else:
-                        extracted_title = _extract_thread_title(user_req)
-                        prefer_title = thread_title or extracted_title
-                        search_kw = keyword or prefer_title
-                        if not search_kw and 2 <= len(user_req) <= 80:
-                            search_kw = user_req
-                        if search_kw:
-                            resolved_id, err2 = await _resolve_thread_id_by_title(
-                                svc.client,
-                                title_or_keyword=search_kw,
-                                prefer_exact_title=prefer_title,
-                            )
-                            if resolved_id is not None and resolved_id != thread_id:
-                                thread_id = resolved_id
-                                thread_result = await svc.client.read_thread(thread_id=thread_id, page=1)
-                                if "error" not in thread_result:
-                                    err_text = ""
-                                else:
-                                    err_text = str(thread_result.get("error") or err_text)
-                            else:
-                                err_text = err2 or err_text
+                # If planner guessed wrong id, fallback to latest threads / title search once.
+                if _is_not_found_error(err_text) and user_req:
+                    prefer_title = thread_title or _extract_thread_title(user_req)
+                    search_kw = keyword or prefer_title
+                    if not search_kw and 2 <= len(user_req) <= 80:
+                        search_kw = user_req
+                    tid, trial, err_text, latest_candidates = await _retry_on_other_thread(
+                        svc.client,
+                        lambda tid: svc.client.read_thread(thread_id=tid, page=1),
+                        thread_id=thread_id,
+                        err_text=err_text,
+                        wants_latest=wants_latest,
+                        latest_candidates=latest_candidates,
+                        search_kw=search_kw,
+                        prefer_title=prefer_title,
+                        concurrent=True,
+                    )
+                    if tid is not None and trial is not None:
+                        thread_id = tid
+                        thread_result = trial
 
                 if err_text:
                     await self.send_text(f"读取帖子失败：{err_text}")
                     return False, "read_thread failed"
 
-            thread_text = str(thread_result.get("text") or "").strip()
+            thread_text = _get_str(thread_result, "text")
             if not thread_text:
                 await self.send_text("读取帖子失败：返回内容为空。")
                 return False, "empty thread text"
-
-            from src.plugin_system.apis import llm_api
-
-            from .prompting import build_forum_persona_block, normalize_plain_text
+            thread_text = _truncate(thread_text, 3500)
 
             persona_block = build_forum_persona_block()
             profile_block = await svc.get_profile_context_block()
             extra_req = f"额外要求：{instruction}\n" if instruction else ""
-            prompt = f"""
-{persona_block}
+            prompt = f"""{persona_block}
 {profile_block}
 
-用户希望你在 AstrBook 论坛回复一个帖子（thread_id={thread_id}）。
+{_REPLY_THREAD_PROMPT_RULES}
+
+目标帖子：thread_id={thread_id}
 {extra_req}
 用户原始请求（供你理解意图，不要原样贴进回复）：
 {user_req or '（无）'}
 
 下面是帖子正文与部分楼层（text 格式，可能被截断）：
-{_truncate(thread_text, 3500)}
-
-请你写一段将要发布到论坛的回复。
-
-只输出严格 JSON（不要输出其他内容）：
-{{"content":"..."}}
-
-要求：
-1) content 10-400 字符，简洁有信息量，避免纯水。
-2) 直接输出要发的正文（纯文本），不要输出 Markdown 代码块/标题/多余说明。
-3) 不要出现“作为AI/作为语言模型”等措辞。
-""".strip()
-
-            temperature = svc.get_config_float("realtime.reply_temperature", default=0.6, min_value=0.0, max_value=2.0)
-            max_tokens = svc.get_config_int("realtime.reply_max_tokens", default=8192, min_value=64, max_value=8192)
+{thread_text}"""
 
-            _, reply_thread_model = resolve_model_slot(svc, task_key="llm.action_reply_thread_slot")
-            ok, resp, _reasoning, model_name = await llm_api.generate_with_model(
+            draft, err = await self._generate_reply_draft(
+                svc,
                 prompt=prompt,
-                model_config=reply_thread_model,
-                request_type="astrbook.action.reply_thread.auto",
-                temperature=temperature,
-                max_tokens=max_tokens,
+                kind="reply_thread",
+                failure_label="自动生成回帖失败",
             )
-            if not ok:
-                logger.warning("[actions] auto reply_thread failed: %s", resp)
-                await self.send_text("自动生成回帖失败：模型调用失败。")
-                return False, "auto reply_thread llm failed"
-
-            data = _parse_json_object(resp) or {}
-            draft = str(data.get("content", "") or "").strip()
-            if not draft:
-                draft = normalize_plain_text(resp)
-            if not draft:
-                logger.warning("[actions] auto reply_thread invalid output model=%s: %s", model_name, resp[:200])
-                await self.send_text("自动生成回帖失败：模型输出解析失败。")
-                return False, "auto reply_thread invalid json"
+            if draft is None:
+                return False, err
 
             content = draft
 
         result = await svc.client.reply_thread(thread_id=thread_id, content=content)
         if "error" in result:
             err_text = str(result.get("error") or "")
-            # Fallback: if wrong id, try to resolve once by title/keyword.
-            if ("not found" in err_text.lower() or "404" in err_text) and (keyword or thread_title or user_req):
-                if wants_latest:
-                    if latest_candidates is None:
-                        latest_candidates, err2 = await _get_latest_thread_candidates(
-                            svc.client, category=None
-                        )
-                    else:
-                        err2 = None
-
-                    if not latest_candidates:
-                        err_text = err2 or err_text
-                    else:
-                        last_err = err_text
-                        for cand in latest_candidates:
-                            tid = cand.get("id")
-                            if not isinstance(tid, int) or tid == thread_id:
-                                continue
-
-                            trial = await svc.client.reply_thread(thread_id=tid, content=content)
-                            if "error" not in trial:
-                                thread_id = tid
-                                result = trial
-                                err_text = ""
-                                break
-
-                            cand_err = str(trial.get("error") or "")
-                            last_err = cand_err or last_err
-                            if "not found" in cand_err.lower() or "404" in cand_err:
-                                continue
-
-                            err_text = cand_err or last_err
-                            break
-                        else:
-                            err_text = last_err
-                else:
-                    extracted_title = _extract_thread_title(user_req)
-                    prefer_title = thread_title or extracted_title
-                    search_kw = keyword or prefer_title
-                    if not search_kw and user_req and 2 <= len(user_req) <= 80:
-                        search_kw = user_req
-                    if search_kw:
-                        resolved_id, err2 = await _resolve_thread_id_by_title(
-                            svc.client,
-                            title_or_keyword=search_kw,
-                            prefer_exact_title=prefer_title,
-                        )
-                        if resolved_id is not None and resolved_id != thread_id:
-                            thread_id = resolved_id
-                            result = await svc.client.reply_thread(thread_id=thread_id, content=content)
-                            if "error" not in result:
-                                err_text = ""
-                            else:
-                                err_text = str(result.get("error") or err_text)
-                        else:
-                            err_text = err2 or err_text
+            # Fallback: if wrong id, try the latest threads / resolve once by title/keyword.
+            if _is_not_found_error(err_text) and (keyword or thread_title or user_req):
+                prefer_title = thread_title or _extract_thread_title(user_req)
+                search_kw = keyword or prefer_title
+                if not search_kw and user_req and 2 <= len(user_req) <= 80:
+                    search_kw = user_req
+                # Sequential on purpose: a concurrent retry could post the reply to several threads.
+                tid, trial, err_text, latest_candidates = await _retry_on_other_thread(
+                    svc.client,
+                    lambda tid: svc.client.reply_thread(thread_id=tid, content=content),
+                    thread_id=thread_id,
+                    err_text=err_text,
+                    wants_latest=wants_latest,
+                    latest_candidates=latest_candidates,
+                    search_kw=search_kw,
+                    prefer_title=prefer_title,
+                    concurrent=False,
+                )
+                if tid is not None and trial is not None:
+                    thread_id = tid
+                    result = trial
 
             if err_text:
                 await self.send_text(f"回帖失败：{err_text}")
                 return False, "reply_thread failed"
 
+        _discard_draft(content)
+
         svc.memory.add_memory(
             "replied",
             f"我回复了帖子ID:{thread_id}: {content[:60]}",
@@ -1386,8 +1604,8 @@ class AstrBookReplyFloorAction(_AstrBookAction):
         if self.action_message:
             user_req = str(getattr(self.action_message, "processed_plain_text", "") or "").strip()
 
-        content = str(self.action_data.get("content", "") or "").strip()
-        instruction = str(self.action_data.get("instruction", "") or "").strip()
+        content = _get_str(self.action_data, "content")
+        instruction = _get_str(self.action_data, "instruction")
         auto_generate = bool(_coerce_bool(self.action_data.get("auto_generate")) or False)
 
         auto_mode = auto_generate or _wants_auto_reply(user_req) or not content
@@ -1400,34 +1618,32 @@ class AstrBookReplyFloorAction(_AstrBookAction):
                 await self.send_text(f"获取楼中楼上下文失败：{ctx_result['error']}")
                 return False, "get_sub_replies failed"
 
-            ctx_text = str(ctx_result.get("text") or "").strip()
+            ctx_text = _get_str(ctx_result, "text")
             if not ctx_text:
                 await self.send_text("无法获取楼中楼上下文，请手动提供 content。")
                 return False, "empty sub_replies context"
+            ctx_text = _truncate(ctx_text, 3500)
 
             thread_text = ""
             if isinstance(thread_id, int):
                 thread_result = await svc.client.read_thread(thread_id=thread_id, page=1)
                 if "text" in thread_result:
-                    thread_text = str(thread_result.get("text") or "").strip()
-
-            from src.plugin_system.apis import llm_api
-
-            from .prompting import build_forum_persona_block, normalize_plain_text
+                    thread_text = _truncate(_get_str(thread_result, "text"), 2500)
 
             persona_block = build_forum_persona_block()
             profile_block = await svc.get_profile_context_block()
             extra_req = f"额外要求：{instruction}\n" if instruction else ""
             thread_ctx_block = (
-                f"\n下面是帖子正文与部分楼层（text 格式，可能被截断）：\n{_truncate(thread_text, 2500)}\n"
+                f"\n下面是帖子正文与部分楼层（text 格式，可能被截断）：\n{thread_text}\n"
                 if thread_text
                 else ""
             )
-            prompt = f"""
-{persona_block}
+            prompt = f"""{persona_block}
 {profile_block}
 
-用户希望你在 AstrBook 论坛进行一次楼中楼回复（reply_id={reply_id}）。
+{_REPLY_FLOOR_PROMPT_RULES}
+
+目标楼层：reply_id={reply_id}
 {extra_req}
 用户原始请求（供你理解意图，不要原样贴进回复）：
 {user_req or '（无）'}
@@ -1435,43 +1651,16 @@ class AstrBookReplyFloorAction(_AstrBookAction):
 {thread_ctx_block}
 
 下面是该楼层与楼中楼回复上下文（text 格式，可能被截断）：
-{_truncate(ctx_text, 3500)}
+{ctx_text}"""
 
-请你写一段将要发布到楼中楼的回复。
-
-只输出严格 JSON（不要输出其他内容）：
-{{"content":"..."}}
-
-要求：
-1) content 10-300 字符，简洁有信息量，避免纯水。
-2) 直接输出要发的正文（纯文本），不要输出 Markdown 代码块/标题/多余说明。
-3) 不要出现“作为AI/作为语言模型”等措辞。
-""".strip()
-
-            temperature = svc.get_config_float("realtime.reply_temperature", default=0.6, min_value=0.0, max_value=2.0)
-            max_tokens = svc.get_config_int("realtime.reply_max_tokens", default=8192, min_value=64, max_value=8192)
-
-            _, reply_floor_model = resolve_model_slot(svc, task_key="llm.action_reply_floor_slot")
-            ok, resp, _reasoning, model_name = await llm_api.generate_with_model(
+            draft, err = await self._generate_reply_draft(
+                svc,
                 prompt=prompt,
-                model_config=reply_floor_model,
-                request_type="astrbook.action.reply_floor.auto",
-                temperature=temperature,
-                max_tokens=max_tokens,
+                kind="reply_floor",
+                failure_label="自动生成楼中楼回复失败",
             )
-            if not ok:
-                logger.warning("[actions] auto reply_floor failed: %s", resp)
-                await self.send_text("自动生成楼中楼回复失败：模型调用失败。")
-                return False, "auto reply_floor llm failed"
-
-            data = _parse_json_object(resp) or {}
-            draft = str(data.get("content", "") or "").strip()
-            if not draft:
-                draft = normalize_plain_text(resp)
-            if not draft:
-                logger.warning("[actions] auto reply_floor invalid output model=%s: %s", model_name, resp[:200])
-                await self.send_text("自动生成楼中楼回复失败：模型输出解析失败。")
-                return False, "auto reply_floor invalid json"
+            if draft is None:
+                return False, err
 
             content = draft
 
@@ -1480,6 +1669,8 @@ class AstrBookReplyFloorAction(_AstrBookAction):
             await self.send_text(f"楼中楼回复失败：{result['error']}")
             return False, "reply_floor failed"
 
+        _discard_draft(content)
+
         svc.memory.add_memory(
             "replied",
             f"我进行了楼中楼回复(reply_id={reply_id}): {content[:60]}",
@@ -1523,7 +1714,7 @@ class AstrBookGetSubRepliesAction(_AstrBookAction):
             await self.send_text(f"获取楼中楼失败：{result['error']}")
             return False, "get_sub_replies failed"
 
-        content = str(result.get("text") or "").strip()
+        content = _get_str(result, "text")
         if not content:
             await self.send_text("楼中楼列表为空或返回异常。")
             return False, "empty sub replies"
@@ -1661,9 +1852,9 @@ class AstrBookToggleFollowAction(_AstrBookAction):
             resolved_name = matched.get("nickname") or matched.get("username") or "未知用户"
             resolved_user_hint = f"（已匹配 @{resolved_name}, user_id={user_id}）"
 
-        action = str(self.action_data.get("action", "") or "").strip().lower()
+        action = _get_str(self.action_data, "action").lower()
         if action not in {"follow", "unfollow"}:
-            if re.search(r"(取消关注|取关|unfollow)", user_req, flags=re.IGNORECASE):
+            if _UNFOLLOW_INTENT_RE.search(user_req):
                 action = "unfollow"
             else:
                 action = "follow"
@@ -1673,7 +1864,7 @@ class AstrBookToggleFollowAction(_AstrBookAction):
             await self.send_text(f"操作失败：{result['error']}")
             return False, "toggle_follow failed"
 
-        msg = str(result.get("message", "") or "").strip()
+        msg = _get_str(result, "message")
         if not msg:
             msg = f"已{'关注' if action == 'follow' else '取消关注'} user_id={user_id}。"
         if resolved_from_keyword and resolved_user_hint:
@@ -1704,9 +1895,9 @@ class AstrBookGetFollowListAction(_AstrBookAction):
         if self.action_message:
             user_req = str(getattr(self.action_message, "processed_plain_text", "") or "").strip()
 
-        list_type = str(self.action_data.get("list_type", "") or "").strip().lower()
+        list_type = _get_str(self.action_data, "list_type").lower()
         if list_type not in {"following", "followers"}:
-            if re.search(r"(粉丝|followers)", user_req, flags=re.IGNORECASE):
+            if _FOLLOWERS_INTENT_RE.search(user_req):
                 list_type = "followers"
             else:
                 list_type = "following"
@@ -1741,7 +1932,7 @@ class AstrBookGetFollowListAction(_AstrBookAction):
 
             user_id = user.get("id", "未知")
             username = str(user.get("username", "Unknown") or "Unknown")
-            nickname = str(user.get("nickname", "") or "").strip() or username
+            nickname = _get_str(user, "nickname") or username
             level = user.get("level", 1)
             created_at = str(item.get("created_at", "") or "")[:10]
 
@@ -1759,11 +1950,11 @@ class AstrBookGetFollowListAction(_AstrBookAction):
 
 def _format_profile_text(profile: dict[str, Any], *, is_self: bool) -> str:
     username = str(profile.get("username", "未知用户") or "未知用户")
-    nickname = str(profile.get("nickname", "") or "").strip() or username
+    nickname = _get_str(profile, "nickname") or username
     level = profile.get("level", 1)
     exp = profile.get("exp", 0)
-    avatar = str(profile.get("avatar", "") or "").strip() or "未设置"
-    persona = str(profile.get("persona", "") or "").strip() or "未设置"
+    avatar = _get_str(profile, "avatar") or "未设置"
+    persona = _get_str(profile, "persona") or "未设置"
     created_at = str(profile.get("created_at", "未知") or "未知")
 
     if len(persona) > 80:
@@ -1828,11 +2019,11 @@ class AstrBookLikeContentAction(_AstrBookAction):
         wants_latest = _wants_latest_thread(user_req)
         latest_candidates: list[dict[str, Any]] | None = None
 
-        target_type = str(self.action_data.get("target_type", "") or "").strip().lower()
+        target_type = _get_str(self.action_data, "target_type").lower()
         if target_type not in {"thread", "reply"}:
-            if re.search(r"(回复|楼层|楼中楼|reply)", user_req, flags=re.IGNORECASE):
+            if _REPLY_TARGET_INTENT_RE.search(user_req):
                 target_type = "reply"
-            elif re.search(r"(帖子|贴子|thread|主题)", user_req, flags=re.IGNORECASE):
+            elif _THREAD_TARGET_INTENT_RE.search(user_req):
                 target_type = "thread"
 
         target_id = _coerce_int(self.action_data.get("target_id"))
@@ -1894,11 +2085,7 @@ class AstrBookLikeContentAction(_AstrBookAction):
         result = await svc.client.like_content(target_type=target_type, target_id=target_id)
         if "error" in result:
             err_text = str(result.get("error") or "")
-            if (
-                target_type == "thread"
-                and wants_latest
-                and ("not found" in err_text.lower() or "404" in err_text)
-            ):
+            if target_type == "thread" and wants_latest and _is_not_found_error(err_text):
                 if latest_candidates is None:
                     latest_candidates, _ = await _get_latest_thread_candidates(svc.client, category=None)
                 if latest_candidates:
@@ -1973,7 +2160,7 @@ class AstrBookGetBlockListAction(_AstrBookAction):
             if not isinstance(blocked_user, dict):
                 blocked_user = {}
             username = str(blocked_user.get("username", "未知用户") or "未知用户")
-            nickname = str(blocked_user.get("nickname", "") or "").strip()
+            nickname = _get_str(blocked_user, "nickname")
             display_name = nickname or username
             user_id = blocked_user.get("id", "未知")
             lines.append(f"- {display_name} (@{username})，用户ID：{user_id}")
@@ -2120,9 +2307,9 @@ class AstrBookSearchUsersAction(_AstrBookAction):
         if self.action_message:
             user_req = str(getattr(self.action_message, "processed_plain_text", "") or "").strip()
 
-        keyword = str(self.action_data.get("keyword", "") or "").strip()
+        keyword = _get_str(self.action_data, "keyword")
         if not keyword and user_req:
-            keyword = re.sub(r"^(查用户|搜索用户|搜用户)\s*", "", user_req).strip()
+            keyword = _SEARCH_USERS_PREFIX_RE.sub("", user_req).strip()
         if not keyword:
             await self.send_text("请提供 keyword，例如：查用户 keyword=小真寻")
             return False, "missing keyword"
@@ -2150,7 +2337,7 @@ class AstrBookSearchUsersAction(_AstrBookAction):
         for user in items:
             if not isinstance(user, dict):
                 continue
-            nickname = str(user.get("nickname", "") or "").strip()
+            nickname = _get_str(user, "nickname")
             username = str(user.get("username", "未知用户") or "未知用户")
             user_id = user.get("id", "未知")
             display_name = nickname or username
@@ -2183,7 +2370,7 @@ class AstrBookCheckNotificationsAction(_AstrBookAction):
 
         fetch_details = _coerce_bool(self.action_data.get("fetch_details"))
         if fetch_details is None:
-            fetch_details = bool(re.search(r"(详情|列表|全部|fetch|read)", user_req, flags=re.IGNORECASE))
+            fetch_details = bool(_FETCH_DETAILS_INTENT_RE.search(user_req))
 
         svc = self._get_service()
         count_result = await svc.client.check_notifications()
@@ -2191,7 +2378,8 @@ class AstrBookCheckNotificationsAction(_AstrBookAction):
             await self.send_text(f"获取通知失败：{count_result['error']}")
             return False, "check_notifications failed"
 
-        unread = _coerce_int(count_result.get("unread")) or 0
+        unread_count = _coerce_int(count_result.get("unread"))
+        unread = unread_count or 0
         total = _coerce_int(count_result.get("total")) or unread
 
         if not fetch_details:
@@ -2204,6 +2392,11 @@ class AstrBookCheckNotificationsAction(_AstrBookAction):
                 await self.send_text("No unread notifications")
             return True, "checked notifications"
 
+        # The server reported zero unread explicitly: skip fetching an empty detail list.
+        if unread_count == 0:
+            await self.send_text("No unread notifications")
+            return True, "no unread notifications"
+
         result = await svc.client.get_notifications(unread_only=True)
         if "error" in result:
             await self.send_text(f"获取通知失败：{result['error']}")
@@ -2399,7 +2592,7 @@ class AstrBookSaveForumDiaryAction(_AstrBookAction):
     associated_types = ["text"]
 
     async def execute(self) -> Tuple[bool, str]:
-        diary = str(self.action_data.get("diary", "") or "").strip()
+        diary = _get_str(self.action_data, "diary")
         if len(diary) < 10:
             await self.send_text("日记内容太短了，请写下更多你的想法和感受。")
             return False, "diary too short"
@@ -1,28 +1,61 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import random
-from typing import Any
+import re
+from dataclasses import dataclass
+from typing import Any, Iterator
 
 from json_repair import repair_json
 
+try:
+    import orjson
+
+    _fast_json_loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json is the fallback.
+    _fast_json_loads = json.loads
+
 from src.common.logger import get_logger
 from src.plugin_system.apis import llm_api
 
 from .model_slots import resolve_model_slot
 from .prompting import build_forum_persona_block
-from .service import AstrBookService
+from .service import AstrBookService, ForumNotification
 
 logger = get_logger("astrbook_forum_auto")
 
 
+# browse.single_pass: how many candidate threads to prefetch, and how much of each to show the model.
+_SINGLE_PASS_PREFETCH_THREADS = 3
+_SINGLE_PASS_THREAD_HEAD_CHARS = 1000
+_SINGLE_PASS_THREAD_TAIL_CHARS = 500
+
+# Thread text budget for reply prompts: opening post (head) + most recent floors (tail).
+_THREAD_HEAD_CHARS = 2000
+_THREAD_TAIL_CHARS = 1000
+
+# "already followed/blocked" server errors, matched in one scan (keyword order varies between messages).
+_ALREADY_FOLLOWED_RE = re.compile(r"already.*follow|follow.*already|已关注|重复关注", re.IGNORECASE | re.DOTALL)
+_ALREADY_BLOCKED_RE = re.compile(r"already.*block|block.*already", re.IGNORECASE | re.DOTALL)
+
+_JSON_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL | re.IGNORECASE)
+
+
 def _parse_json_object(text: str) -> dict[str, Any] | None:
+    if not text:
+        return None
+    # Strict parsing first (minus a surrounding code fence); repair_json is only needed for malformed output.
+    m = _JSON_FENCE_RE.match(text)
     try:
-        fixed = repair_json(text)
-        data = json.loads(fixed)
-        return data if isinstance(data, dict) else None
+        data = _fast_json_loads(m.group(1) if m else text)
     except Exception:
-        return None
+        try:
+            # Repair and decode in one pass; the strict parse above already failed.
+            data = repair_json(text, return_objects=True, skip_json_loads=True)
+        except Exception:
+            return None
+    return data if isinstance(data, dict) else None
 
 
 def _truncate(text: str, max_chars: int) -> str:
@@ -33,37 +66,50 @@ def _truncate(text: str, max_chars: int) -> str:
     return text[: max_chars - 1] + "…"
 
 
+def _truncate_head_tail(text: str, head_chars: int, tail_chars: int) -> str:
+    """Keep the opening post and the latest floors; drop the middle of long threads."""
+    if len(text) <= head_chars + tail_chars:
+        return text
+    return f"{text[:head_chars]}\n…（中间楼层已省略）…\n{text[len(text) - tail_chars:]}"
+
+
 
 def _safe_int(value: Any) -> int | None:
-    if isinstance(value, bool):
+    value_type = type(value)
+    if value_type is int:
+        return value
+    if value_type is bool:
         return None
     if isinstance(value, int):
         return value
-    if isinstance(value, str):
+    if value_type is str:
+        # Only plain non-negative digits: int() alone would also accept signs and underscores.
         text = value.strip()
-        if text.isdigit():
-            try:
-                return int(text)
-            except Exception:
-                return None
+        if not text.isdigit():
+            return None
+        try:
+            return int(text)
+        except ValueError:  # non-ASCII digits such as "²"
+            return None
     return None
 
 
-def _iter_thread_items(payload: dict[str, Any]) -> list[dict[str, Any]]:
+def _iter_thread_items(payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Yield thread dicts lazily so lookups can stop at the first match."""
     for key in ("items", "threads", "data", "results", "list"):
         value = payload.get(key)
         if isinstance(value, list):
-            return [item for item in value if isinstance(item, dict)]
+            yield from (item for item in value if isinstance(item, dict))
+            return
         if isinstance(value, dict):
             nested = value.get("items") or value.get("threads")
             if isinstance(nested, list):
-                return [item for item in nested if isinstance(item, dict)]
-    return []
+                yield from (item for item in nested if isinstance(item, dict))
+                return
 
 
 def _extract_thread_author_id(threads_result: dict[str, Any], thread_id: int) -> int | None:
-    items = _iter_thread_items(threads_result)
-    for item in items:
+    for item in _iter_thread_items(threads_result):
         current_thread_id = _safe_int(item.get("id")) or _safe_int(item.get("thread_id"))
         if current_thread_id != thread_id:
             continue
@@ -81,129 +127,169 @@ def _extract_thread_author_id(threads_result: dict[str, Any], thread_id: int) ->
     return None
 
 
-async def _apply_autonomous_social_actions(
-    service: AstrBookService,
-    *,
-    enabled: bool,
-    scene: str,
-    like_enabled: bool,
-    like_target_type: str,
-    like_target_id: int | None,
-    follow_enabled: bool,
-    follow_user_id: int | None,
-    block_enabled: bool,
-    block_user_id: int | None,
-) -> None:
-    if not enabled:
+async def _auto_like(service: AstrBookService, *, scene: str, target_type: str, target_id: int) -> None:
+    like_result = await service.client.like_content(target_type=target_type, target_id=target_id)
+    metadata = {"target_type": target_type, "target_id": target_id, "scene": scene}
+    if "error" in like_result:
+        service.memory.add_memory(
+            "auto_action",
+            f"{scene}时尝试点赞{target_type}#{target_id}失败：{like_result['error']}",
+            metadata=metadata,
+        )
         return
 
-    if like_enabled and like_target_type in {"thread", "reply"} and isinstance(like_target_id, int):
-        like_result = await service.client.like_content(target_type=like_target_type, target_id=like_target_id)
-        if "error" in like_result:
+    liked = bool(like_result.get("liked", False))
+    like_count = like_result.get("like_count")
+    like_count_text = str(like_count) if isinstance(like_count, int) else "未知"
+    if liked:
+        service.memory.add_memory(
+            "auto_action",
+            f"{scene}时已自主点赞{target_type}#{target_id}（当前点赞数：{like_count_text}）。",
+            metadata=metadata,
+        )
+    else:
+        service.memory.add_memory(
+            "auto_action",
+            f"{scene}时检测到{target_type}#{target_id}此前已点赞（当前点赞数：{like_count_text}）。",
+            metadata=metadata,
+        )
+
+
+async def _auto_follow(service: AstrBookService, *, scene: str, user_id: int) -> None:
+    follow_result = await service.client.toggle_follow(user_id=user_id, action="follow")
+    metadata = {"followed_user_id": user_id, "scene": scene}
+    if "error" in follow_result:
+        error_text = str(follow_result.get("error") or "")
+        if _ALREADY_FOLLOWED_RE.search(error_text):
             service.memory.add_memory(
                 "auto_action",
-                f"{scene}时尝试点赞{like_target_type}#{like_target_id}失败：{like_result['error']}",
-                metadata={"target_type": like_target_type, "target_id": like_target_id, "scene": scene},
+                f"{scene}时检测到 user_id={user_id} 已在关注列表中。",
+                metadata=metadata,
             )
         else:
-            liked = bool(like_result.get("liked", False))
-            like_count = like_result.get("like_count")
-            like_count_text = str(like_count) if isinstance(like_count, int) else "未知"
-            if liked:
-                service.memory.add_memory(
-                    "auto_action",
-                    f"{scene}时已自主点赞{like_target_type}#{like_target_id}（当前点赞数：{like_count_text}）。",
-                    metadata={"target_type": like_target_type, "target_id": like_target_id, "scene": scene},
-                )
-            else:
-                service.memory.add_memory(
-                    "auto_action",
-                    f"{scene}时检测到{like_target_type}#{like_target_id}此前已点赞（当前点赞数：{like_count_text}）。",
-                    metadata={"target_type": like_target_type, "target_id": like_target_id, "scene": scene},
-                )
-
-    if follow_enabled and isinstance(follow_user_id, int):
-        if not (service.bot_user_id and follow_user_id == service.bot_user_id):
-            follow_result = await service.client.toggle_follow(user_id=follow_user_id, action="follow")
-            if "error" in follow_result:
-                error_text = str(follow_result.get("error") or "")
-                error_lower = error_text.lower()
-                already_followed = (
-                    ("already" in error_lower and "follow" in error_lower)
-                    or "已关注" in error_text
-                    or "重复关注" in error_text
-                )
-                if already_followed:
-                    service.memory.add_memory(
-                        "auto_action",
-                        f"{scene}时检测到 user_id={follow_user_id} 已在关注列表中。",
-                        metadata={"followed_user_id": follow_user_id, "scene": scene},
-                    )
-                else:
-                    service.memory.add_memory(
-                        "auto_action",
-                        f"{scene}时尝试关注 user_id={follow_user_id} 失败：{error_text or 'unknown error'}",
-                        metadata={"followed_user_id": follow_user_id, "scene": scene},
-                    )
-            else:
-                msg = str(follow_result.get("message", "") or "").strip()
-                if bool(follow_result.get("already_following", False)):
-                    summary = f"{scene}时检测到 user_id={follow_user_id} 已在关注列表中。"
-                else:
-                    suffix = f"（{msg}）" if msg else ""
-                    summary = f"{scene}时已自主关注 user_id={follow_user_id}{suffix}"
-
-                service.memory.add_memory(
-                    "auto_action",
-                    summary,
-                    metadata={"followed_user_id": follow_user_id, "scene": scene},
-                )
-
-    if not block_enabled:
-        return
-    if not isinstance(block_user_id, int):
-        return
-    if service.bot_user_id and block_user_id == service.bot_user_id:
+            service.memory.add_memory(
+                "auto_action",
+                f"{scene}时尝试关注 user_id={user_id} 失败：{error_text or 'unknown error'}",
+                metadata=metadata,
+            )
         return
 
-    block_result = await service.client.block_user(user_id=block_user_id)
+    msg = str(follow_result.get("message", "") or "").strip()
+    if bool(follow_result.get("already_following", False)):
+        summary = f"{scene}时检测到 user_id={user_id} 已在关注列表中。"
+    else:
+        suffix = f"（{msg}）" if msg else ""
+        summary = f"{scene}时已自主关注 user_id={user_id}{suffix}"
+
+    service.memory.add_memory(
+        "auto_action",
+        summary,
+        metadata=metadata,
+    )
+
+
+async def _auto_block(service: AstrBookService, *, scene: str, user_id: int) -> None:
+    block_result = await service.client.block_user(user_id=user_id)
+    metadata = {"blocked_user_id": user_id, "scene": scene}
     if "error" in block_result:
         error_text = str(block_result.get("error") or "")
-        if "already" in error_text.lower() and "block" in error_text.lower():
+        if _ALREADY_BLOCKED_RE.search(error_text):
             service.memory.add_memory(
                 "auto_action",
-                f"{scene}时检测到 user_id={block_user_id} 已在黑名单中。",
-                metadata={"blocked_user_id": block_user_id, "scene": scene},
+                f"{scene}时检测到 user_id={user_id} 已在黑名单中。",
+                metadata=metadata,
             )
             return
 
         service.memory.add_memory(
             "auto_action",
-            f"{scene}时尝试拉黑 user_id={block_user_id} 失败：{error_text or 'unknown error'}",
-            metadata={"blocked_user_id": block_user_id, "scene": scene},
+            f"{scene}时尝试拉黑 user_id={user_id} 失败：{error_text or 'unknown error'}",
+            metadata=metadata,
         )
         return
 
     service.memory.add_memory(
         "auto_action",
-        f"{scene}时已自主拉黑 user_id={block_user_id}。",
-        metadata={"blocked_user_id": block_user_id, "scene": scene},
+        f"{scene}时已自主拉黑 user_id={user_id}。",
+        metadata=metadata,
     )
 
 
-async def auto_reply_notification(service: AstrBookService, notification: dict[str, Any]) -> None:
+async def _auto_follow_then_block(
+    service: AstrBookService, *, scene: str, follow_user_id: int | None, block_user_id: int | None
+) -> None:
+    # Follow/block may target the same user, so keep them ordered.
+    if follow_user_id is not None:
+        await _auto_follow(service, scene=scene, user_id=follow_user_id)
+    if block_user_id is not None:
+        await _auto_block(service, scene=scene, user_id=block_user_id)
+
+
+@dataclass(frozen=True, slots=True)
+class _SocialIntent:
+    """Like/follow/block decisions for one scene, built once per LLM decision."""
+
+    enabled: bool
+    scene: str
+    like_enabled: bool
+    like_target_type: str
+    like_target_id: int | None
+    follow_enabled: bool
+    follow_user_id: int | None
+    block_enabled: bool
+    block_user_id: int | None
+
+
+async def _apply_autonomous_social_actions(service: AstrBookService, intent: _SocialIntent) -> None:
+    if not intent.enabled:
+        return
+
+    scene = intent.scene
+    like_target_type = intent.like_target_type
+    like_target_id = intent.like_target_id
+    follow_user_id = intent.follow_user_id
+    block_user_id = intent.block_user_id
+    bot_user_id = service.bot_user_id
+    do_like = intent.like_enabled and like_target_type in {"thread", "reply"} and isinstance(like_target_id, int)
+    if not (intent.follow_enabled and isinstance(follow_user_id, int)) or (
+        bot_user_id and follow_user_id == bot_user_id
+    ):
+        follow_user_id = None
+    if not (intent.block_enabled and isinstance(block_user_id, int)) or (bot_user_id and block_user_id == bot_user_id):
+        block_user_id = None
+
+    # Liking is independent of follow/block, so run it alongside them.
+    jobs = []
+    if do_like:
+        jobs.append(_auto_like(service, scene=scene, target_type=like_target_type, target_id=like_target_id))
+    if follow_user_id is not None or block_user_id is not None:
+        jobs.append(
+            _auto_follow_then_block(
+                service, scene=scene, follow_user_id=follow_user_id, block_user_id=block_user_id
+            )
+        )
+    if len(jobs) == 1:
+        await jobs[0]
+    elif jobs:
+        await asyncio.gather(*jobs)
+
+
+async def auto_reply_notification(service: AstrBookService, notification: ForumNotification) -> None:
     """Auto reply for an SSE notification (reply/sub_reply/mention/new_post)."""
 
-    thread_id = notification.get("thread_id")
-    reply_id = notification.get("reply_id")
-    thread_title = str(notification.get("thread_title", "") or "")
-    from_user_id = notification.get("from_user_id")
-    from_username = str(notification.get("from_username") or notification.get("author") or "unknown")
-    msg_type = str(notification.get("type", "") or "")
-    content = str(notification.get("content", "") or "")
+    # Notifications for the same thread are handled in order, so a later one reads the earlier reply.
+    async with service.thread_reply_lock(notification.thread_id):
+        await _auto_reply_notification_locked(service, notification)
 
-    if not isinstance(thread_id, int):
-        return
+
+async def _auto_reply_notification_locked(service: AstrBookService, notification: ForumNotification) -> None:
+    thread_id = notification.thread_id
+    reply_id = notification.reply_id
+    thread_title = notification.thread_title
+    from_user_id = notification.from_user_id
+    from_username = notification.from_username
+    msg_type = notification.msg_type
+    content = notification.content
 
     social_actions_enabled = service.get_config_bool("realtime.autonomous_social_actions", default=True)
     follow_actions_enabled = social_actions_enabled and service.get_config_bool("realtime.autonomous_follow", default=False)
@@ -216,13 +302,12 @@ async def auto_reply_notification(service: AstrBookService, notification: dict[s
     if "text" in thread_result:
         thread_text = str(thread_result.get("text") or "")
 
-    thread_text = _truncate(thread_text, max_chars=3500)
+    thread_text = _truncate_head_tail(thread_text, _THREAD_HEAD_CHARS, _THREAD_TAIL_CHARS)
     notif_text = _truncate(content, max_chars=800)
 
     persona_block = build_forum_persona_block()
     profile_block = await service.get_profile_context_block()
-    prompt = f"""
-{persona_block}
+    prompt = f"""{persona_block}
 {profile_block}
 
 你正在 AstrBook 论坛参与讨论。
@@ -245,20 +330,20 @@ async def auto_reply_notification(service: AstrBookService, notification: dict[s
 4) 回复需有实质内容，避免纯水；语气自然、友好。
 5) should_like=true 表示对当前通知相关目标点个赞（优先点赞被回复的楼层，其次帖子）。
 6) should_follow=true 表示关注通知发起者（仅在对方长期输出高质量内容时使用，默认 false）。
-7) block_user=true 仅在对方明显恶意骚扰/辱骂/广告刷屏时才使用，正常讨论必须为 false。
-""".strip()
+7) block_user=true 仅在对方明显恶意骚扰/辱骂/广告刷屏时才使用，正常讨论必须为 false。"""
 
     temperature = service.get_config_float("realtime.reply_temperature", default=0.4, min_value=0.0, max_value=2.0)
     max_tokens = service.get_config_int("realtime.reply_max_tokens", default=8192, min_value=32, max_value=8192)
 
     _, model_slot_config = resolve_model_slot(service, task_key="llm.realtime_auto_reply_slot")
-    ok, resp, _reasoning, model_name = await llm_api.generate_with_model(
-        prompt=prompt,
-        model_config=model_slot_config,
-        request_type="astrbook.auto_reply",
-        temperature=temperature,
-        max_tokens=max_tokens,
-    )
+    async with service.auto_reply_llm_semaphore:
+        ok, resp, _reasoning, model_name = await llm_api.generate_with_model(
+            prompt=prompt,
+            model_config=model_slot_config,
+            request_type="astrbook.auto_reply",
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
     if not ok:
         logger.warning(f"[auto_reply] LLM failed: {resp}")
         return
@@ -273,6 +358,17 @@ async def auto_reply_notification(service: AstrBookService, notification: dict[s
     should_like = bool(data.get("should_like", False))
     should_follow = bool(data.get("should_follow", False))
     should_block = bool(data.get("block_user", False))
+    social_intent = _SocialIntent(
+        enabled=social_actions_enabled,
+        scene="通知自动处理",
+        like_enabled=should_like,
+        like_target_type=like_target_type,
+        like_target_id=like_target_id if isinstance(like_target_id, int) else None,
+        follow_enabled=should_follow and follow_actions_enabled,
+        follow_user_id=from_user_id if isinstance(from_user_id, int) else None,
+        block_enabled=should_block and block_actions_enabled,
+        block_user_id=from_user_id if isinstance(from_user_id, int) else None,
+    )
 
     if not should_reply or not reply_content:
         service.memory.add_memory(
@@ -285,18 +381,7 @@ async def auto_reply_notification(service: AstrBookService, notification: dict[s
                 "notification_type": msg_type,
             },
         )
-        await _apply_autonomous_social_actions(
-            service,
-            enabled=social_actions_enabled,
-            scene="通知自动处理",
-            like_enabled=should_like,
-            like_target_type=like_target_type,
-            like_target_id=like_target_id if isinstance(like_target_id, int) else None,
-            follow_enabled=should_follow and follow_actions_enabled,
-            follow_user_id=from_user_id if isinstance(from_user_id, int) else None,
-            block_enabled=should_block and block_actions_enabled,
-            block_user_id=from_user_id if isinstance(from_user_id, int) else None,
-        )
+        await _apply_autonomous_social_actions(service, social_intent)
         return
 
     if isinstance(reply_id, int):
@@ -308,18 +393,7 @@ async def auto_reply_notification(service: AstrBookService, notification: dict[s
                 f"我尝试在帖子《{thread_title}》(ID:{thread_id}) 楼中楼回复 @{from_username} 但失败了：{result['error']}",
                 metadata={"thread_id": thread_id, "reply_id": reply_id, "from_user": from_username},
             )
-            await _apply_autonomous_social_actions(
-                service,
-                enabled=social_actions_enabled,
-                scene="通知自动处理",
-                like_enabled=should_like,
-                like_target_type=like_target_type,
-                like_target_id=like_target_id if isinstance(like_target_id, int) else None,
-                follow_enabled=should_follow and follow_actions_enabled,
-                follow_user_id=from_user_id if isinstance(from_user_id, int) else None,
-                block_enabled=should_block and block_actions_enabled,
-                block_user_id=from_user_id if isinstance(from_user_id, int) else None,
-            )
+            await _apply_autonomous_social_actions(service, social_intent)
             return
 
         service.memory.add_memory(
@@ -327,18 +401,7 @@ async def auto_reply_notification(service: AstrBookService, notification: dict[s
             f"我在帖子《{thread_title}》(ID:{thread_id}) 的楼中楼回复了 @{from_username}: {_truncate(reply_content, 60)}",
             metadata={"thread_id": thread_id, "reply_id": reply_id, "from_user": from_username},
         )
-        await _apply_autonomous_social_actions(
-            service,
-            enabled=social_actions_enabled,
-            scene="通知自动处理",
-            like_enabled=should_like,
-            like_target_type=like_target_type,
-            like_target_id=like_target_id if isinstance(like_target_id, int) else None,
-            follow_enabled=should_follow and follow_actions_enabled,
-            follow_user_id=from_user_id if isinstance(from_user_id, int) else None,
-            block_enabled=should_block and block_actions_enabled,
-            block_user_id=from_user_id if isinstance(from_user_id, int) else None,
-        )
+        await _apply_autonomous_social_actions(service, social_intent)
         return
 
     result = await service.client.reply_thread(thread_id=thread_id, content=reply_content)
@@ -349,18 +412,7 @@ async def auto_reply_notification(service: AstrBookService, notification: dict[s
             f"我尝试在帖子《{thread_title}》(ID:{thread_id}) 回复 @{from_username} 但失败了：{result['error']}",
             metadata={"thread_id": thread_id, "from_user": from_username},
         )
-        await _apply_autonomous_social_actions(
-            service,
-            enabled=social_actions_enabled,
-            scene="通知自动处理",
-            like_enabled=should_like,
-            like_target_type=like_target_type,
-            like_target_id=like_target_id if isinstance(like_target_id, int) else None,
-            follow_enabled=should_follow and follow_actions_enabled,
-            follow_user_id=from_user_id if isinstance(from_user_id, int) else None,
-            block_enabled=should_block and block_actions_enabled,
-            block_user_id=from_user_id if isinstance(from_user_id, int) else None,
-        )
+        await _apply_autonomous_social_actions(service, social_intent)
         return
 
     service.memory.add_memory(
@@ -368,17 +420,188 @@ async def auto_reply_notification(service: AstrBookService, notification: dict[s
         f"我在帖子《{thread_title}》(ID:{thread_id}) 回复了 @{from_username}: {_truncate(reply_content, 60)}",
         metadata={"thread_id": thread_id, "from_user": from_username},
     )
-    await _apply_autonomous_social_actions(
-        service,
+    await _apply_autonomous_social_actions(service, social_intent)
+
+
+async def _apply_browse_reply_decision(
+    service: AstrBookService,
+    reply_data: dict[str, Any],
+    *,
+    thread_id: int,
+    category: str | None,
+    fallback_diary: str,
+    thread_author_id: int | None,
+    social_actions_enabled: bool,
+    follow_actions_enabled: bool,
+    block_actions_enabled: bool,
+) -> None:
+    """Record the diary, post the reply (if any) and run social actions for one browsed thread."""
+
+    diary2 = str(reply_data.get("diary", "") or "").strip()
+    final_diary = diary2 or fallback_diary
+    if final_diary:
+        service.memory.add_diary(final_diary)
+
+    should_reply = bool(reply_data.get("should_reply", False))
+    reply_content = str(reply_data.get("content", "") or "").strip()
+    should_like = bool(reply_data.get("should_like", False))
+    follow_thread_author = bool(reply_data.get("follow_thread_author", False))
+    block_thread_author = bool(reply_data.get("block_thread_author", False))
+    social_intent = _SocialIntent(
         enabled=social_actions_enabled,
-        scene="通知自动处理",
+        scene="定时逛帖",
         like_enabled=should_like,
-        like_target_type=like_target_type,
-        like_target_id=like_target_id if isinstance(like_target_id, int) else None,
-        follow_enabled=should_follow and follow_actions_enabled,
-        follow_user_id=from_user_id if isinstance(from_user_id, int) else None,
-        block_enabled=should_block and block_actions_enabled,
-        block_user_id=from_user_id if isinstance(from_user_id, int) else None,
+        like_target_type="thread",
+        like_target_id=thread_id,
+        follow_enabled=follow_thread_author and follow_actions_enabled,
+        follow_user_id=thread_author_id,
+        block_enabled=block_thread_author and block_actions_enabled,
+        block_user_id=thread_author_id,
+    )
+
+    if not should_reply or not reply_content:
+        service.memory.add_memory(
+            "browsed",
+            f"我逛论坛时读完帖子ID:{thread_id} 后决定不回复。",
+            metadata={"thread_id": thread_id, "category": category},
+        )
+        await _apply_autonomous_social_actions(service, social_intent)
+        return
+
+    post = await service.client.reply_thread(thread_id=thread_id, content=reply_content)
+    if "error" in post:
+        service.last_error = str(post.get("error"))
+        service.memory.add_memory(
+            "browsed",
+            f"我逛论坛时尝试回复帖子ID:{thread_id}但失败了：{post['error']}",
+            metadata={"thread_id": thread_id, "category": category},
+        )
+        await _apply_autonomous_social_actions(service, social_intent)
+        return
+
+    service.memory.add_memory(
+        "replied",
+        f"我逛论坛时在帖子ID:{thread_id} 回复了一段内容：{_truncate(reply_content, 60)}",
+        metadata={"thread_id": thread_id, "category": category},
+    )
+    await _apply_autonomous_social_actions(service, social_intent)
+
+
+async def _browse_single_pass(
+    service: AstrBookService,
+    *,
+    category: str | None,
+    browse_text: str,
+    skip_thread_id_set: set[int],
+    persona_block: str,
+    profile_block: str,
+    temperature: float,
+    max_tokens: int,
+    social_actions_enabled: bool,
+    follow_actions_enabled: bool,
+    block_actions_enabled: bool,
+) -> None:
+    """Single-LLM-call browse: prefetch a few candidate threads, then pick/read/reply in one decision."""
+
+    listing_result = await service.client.list_threads(page=1, page_size=10, category=category)
+    if not isinstance(listing_result, dict) or "error" in listing_result:
+        listing_result = {}
+
+    candidate_ids: list[int] = []
+    for item in _iter_thread_items(listing_result):
+        candidate_id = _safe_int(item.get("id")) or _safe_int(item.get("thread_id"))
+        if candidate_id is None or candidate_id in skip_thread_id_set or candidate_id in candidate_ids:
+            continue
+        candidate_ids.append(candidate_id)
+        if len(candidate_ids) >= _SINGLE_PASS_PREFETCH_THREADS:
+            break
+    if not candidate_ids:
+        service.memory.add_memory("browsed", "我逛了逛 AstrBook 论坛，没有发表回复。", metadata={"category": category})
+        return
+
+    read_results = await service.client.read_threads_bulk(candidate_ids, page=1)
+    readable_ids: set[int] = set()
+    thread_blocks: list[str] = []
+    for candidate_id, thread_result in zip(candidate_ids, read_results):
+        if "error" in thread_result:
+            service.last_error = str(thread_result.get("error"))
+            continue
+        readable_ids.add(candidate_id)
+        thread_text = _truncate_head_tail(
+            str(thread_result.get("text") or ""), _SINGLE_PASS_THREAD_HEAD_CHARS, _SINGLE_PASS_THREAD_TAIL_CHARS
+        )
+        thread_blocks.append(f"===== 帖子ID:{candidate_id} =====\n{thread_text}")
+    if not thread_blocks:
+        service.memory.add_memory(
+            "browsed",
+            f"我逛论坛时尝试打开帖子 {candidate_ids} 但都读取失败：{service.last_error}",
+            metadata={"category": category},
+        )
+        return
+
+    threads_text = "\n\n".join(thread_blocks)
+    prompt = f"""{persona_block}
+{profile_block}
+
+你正在 AstrBook 论坛闲逛，现在是一次定时逛帖任务。
+
+下面是论坛的帖子列表（text 格式输出）：
+{_truncate(browse_text, 3500)}
+
+其中以下帖子你已经打开并阅读了（正文与部分楼层，可能被截断）：
+{threads_text}
+
+你最多可以在上面已阅读的某一个帖子下回复 1 次（不要发新帖），也可以只浏览不回复。
+
+请输出严格 JSON（不要输出其他内容）：
+
+{{"action":"none"|"reply_thread","thread_id": 123, "should_reply": true/false, "content": "...", "diary": "...", "should_like": true/false, "follow_thread_author": true/false, "block_thread_author": true/false}}
+
+字段说明：
+- action: none 表示只浏览不互动；reply_thread 表示你选定了一个已阅读的帖子（再由 should_reply 决定是否回复）
+- thread_id: 当 action=reply_thread 时必填，且必须是上面已阅读的帖子ID
+- should_reply=false 时，content 为空字符串；回复需有实质内容，避免纯水；语气自然、友好
+- should_like=true 表示给该帖子点个赞
+- follow_thread_author=true 表示关注该帖作者（仅在其内容持续高质量时使用，默认 false）
+- block_thread_author=true 仅在作者明显恶意骚扰/辱骂/广告刷屏时才使用，正常讨论必须为 false
+- diary: 逛帖日记/总结（建议填写，50-300字左右）"""
+
+    _, browse_decision_model = resolve_model_slot(service, task_key="llm.browse_decision_slot")
+    ok, resp, _reasoning, model_name = await llm_api.generate_with_model(
+        prompt=prompt,
+        model_config=browse_decision_model,
+        request_type="astrbook.browse",
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+    if not ok:
+        logger.warning(f"[browse] LLM failed: {resp}")
+        return
+
+    data = _parse_json_object(resp)
+    if not data:
+        logger.warning(f"[browse] invalid json from model={model_name}: {resp[:200]}")
+        return
+
+    diary = str(data.get("diary", "") or "").strip()
+    action = str(data.get("action", "none") or "none").strip()
+    thread_id = data.get("thread_id")
+    if action != "reply_thread" or not isinstance(thread_id, int) or thread_id not in readable_ids:
+        if diary:
+            service.memory.add_diary(diary)
+        service.memory.add_memory("browsed", "我逛了逛 AstrBook 论坛，没有发表回复。", metadata={"category": category})
+        return
+
+    await _apply_browse_reply_decision(
+        service,
+        data,
+        thread_id=thread_id,
+        category=category,
+        fallback_diary="",
+        thread_author_id=_extract_thread_author_id(listing_result, thread_id),
+        social_actions_enabled=social_actions_enabled,
+        follow_actions_enabled=follow_actions_enabled,
+        block_actions_enabled=block_actions_enabled,
     )
 
 
@@ -393,6 +616,7 @@ async def browse_once(service: AstrBookService) -> None:
     social_actions_enabled = service.get_config_bool("browse.autonomous_social_actions", default=True)
     follow_actions_enabled = social_actions_enabled and service.get_config_bool("browse.autonomous_follow", default=False)
     block_actions_enabled = social_actions_enabled and service.get_config_bool("browse.autonomous_block", default=False)
+    max_replies = service.get_config_int("browse.max_replies_per_session", default=1, min_value=0, max_value=5)
 
     result = await service.client.browse_threads(page=1, page_size=10, category=category)
     if "error" in result:
@@ -401,16 +625,37 @@ async def browse_once(service: AstrBookService) -> None:
     browse_text = str(result.get("text") or "")
     if not browse_text.strip():
         return
+    # Replies disabled: the listing above keeps last_error fresh; skip the prompt build and both LLM calls.
+    if max_replies <= 0:
+        return
 
     skip_window = service.get_config_int(
         "browse.skip_threads_window_sec", default=86400, min_value=0, max_value=86400 * 30
     )
-    skip_thread_ids = sorted(service.memory.get_recent_thread_ids(window_sec=skip_window))
+    skip_thread_id_set = service.memory.get_recent_thread_ids(window_sec=skip_window)
 
     persona_block = build_forum_persona_block()
     profile_block = await service.get_profile_context_block()
-    prompt = f"""
-{persona_block}
+    temperature = service.get_config_float("browse.browse_temperature", default=0.6, min_value=0.0, max_value=2.0)
+    max_tokens = service.get_config_int("browse.browse_max_tokens", default=8192, min_value=64, max_value=8192)
+
+    if service.get_config_bool("browse.single_pass", default=False):
+        await _browse_single_pass(
+            service,
+            category=category,
+            browse_text=browse_text,
+            skip_thread_id_set=skip_thread_id_set,
+            persona_block=persona_block,
+            profile_block=profile_block,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            social_actions_enabled=social_actions_enabled,
+            follow_actions_enabled=follow_actions_enabled,
+            block_actions_enabled=block_actions_enabled,
+        )
+        return
+
+    prompt = f"""{persona_block}
 {profile_block}
 
 你正在 AstrBook 论坛闲逛，现在是一次定时逛帖任务。
@@ -421,7 +666,7 @@ async def browse_once(service: AstrBookService) -> None:
 你最多可以在一个帖子下回复 1 次（不要发新帖）。为了避免“没看内容就回”，你需要先选择一个帖子去阅读，然后再决定是否回复。
 
 请避免选择你最近已经参与过的帖子（避免重复），以下是你最近参与过的 thread_id 列表：
-{skip_thread_ids}
+{sorted(skip_thread_id_set)}
 
 请输出严格 JSON（不要输出其他内容）：
 
@@ -431,11 +676,7 @@ async def browse_once(service: AstrBookService) -> None:
 - action: none 表示只浏览不回复；reply_thread 表示你想打开并阅读某个帖子，然后再决定是否回复
 - thread_id: 当 action=reply_thread 时必填
 - thread_title: 可选，帖子标题（便于记录）
-- diary: 逛帖日记/总结（建议填写，50-300字左右）
-""".strip()
-
-    temperature = service.get_config_float("browse.browse_temperature", default=0.6, min_value=0.0, max_value=2.0)
-    max_tokens = service.get_config_int("browse.browse_max_tokens", default=8192, min_value=64, max_value=8192)
+- diary: 逛帖日记/总结（建议填写，50-300字左右）"""
 
     _, browse_decision_model = resolve_model_slot(service, task_key="llm.browse_decision_slot")
     ok, resp, _reasoning, model_name = await llm_api.generate_with_model(
@@ -467,7 +708,7 @@ async def browse_once(service: AstrBookService) -> None:
     if not isinstance(thread_id, int):
         return
 
-    if thread_id in set(skip_thread_ids):
+    if thread_id in skip_thread_id_set:
         if diary:
             service.memory.add_diary(diary)
         service.memory.add_memory(
@@ -477,18 +718,20 @@ async def browse_once(service: AstrBookService) -> None:
         )
         return
 
-    max_replies = service.get_config_int("browse.max_replies_per_session", default=1, min_value=0, max_value=5)
-    if max_replies <= 0:
-        return
-
+    # The thread read and the author lookup are independent; overlap their round-trips.
+    read_task = asyncio.create_task(service.client.read_thread(thread_id=thread_id, page=1))
     thread_author_id: int | None = None
     if social_actions_enabled:
-        listing_result = await service.client.list_threads(page=1, page_size=20, category=category)
+        try:
+            listing_result = await service.client.list_threads(page=1, page_size=20, category=category)
+        except BaseException:
+            read_task.cancel()
+            raise
         if isinstance(listing_result, dict) and "error" not in listing_result:
             thread_author_id = _extract_thread_author_id(listing_result, thread_id)
 
     thread_text = ""
-    thread_result = await service.client.read_thread(thread_id=thread_id, page=1)
+    thread_result = await read_task
     if "error" in thread_result:
         service.last_error = str(thread_result.get("error"))
         if diary:
@@ -502,10 +745,9 @@ async def browse_once(service: AstrBookService) -> None:
     if "text" in thread_result:
         thread_text = str(thread_result.get("text") or "")
 
-    thread_text = _truncate(thread_text, max_chars=3500)
+    thread_text = _truncate_head_tail(thread_text, _THREAD_HEAD_CHARS, _THREAD_TAIL_CHARS)
 
-    reply_prompt = f"""
-{persona_block}
+    reply_prompt = f"""{persona_block}
 {profile_block}
 
 你正在 AstrBook 论坛闲逛，这是一次定时逛帖任务。
@@ -527,8 +769,7 @@ async def browse_once(service: AstrBookService) -> None:
 5) should_like=true 表示给该帖子点个赞。
 6) follow_thread_author=true 表示关注该帖作者（仅在其内容持续高质量时使用，默认 false）。
 7) block_thread_author=true 仅在作者明显恶意骚扰/辱骂/广告刷屏时才使用，正常讨论必须为 false。
-8) diary 为逛帖日记/总结（建议填写，50-300字左右）。
-""".strip()
+8) diary 为逛帖日记/总结（建议填写，50-300字左右）。"""
 
     _, browse_reply_model = resolve_model_slot(service, task_key="llm.browse_reply_slot")
     ok, resp, _reasoning, model_name = await llm_api.generate_with_model(
@@ -547,73 +788,14 @@ async def browse_once(service: AstrBookService) -> None:
         logger.warning(f"[browse.reply] invalid json from model={model_name}: {resp[:200]}")
         return
 
-    diary2 = str(reply_data.get("diary", "") or "").strip()
-    final_diary = diary2 or diary
-    if final_diary:
-        service.memory.add_diary(final_diary)
-
-    should_reply = bool(reply_data.get("should_reply", False))
-    reply_content = str(reply_data.get("content", "") or "").strip()
-    should_like = bool(reply_data.get("should_like", False))
-    follow_thread_author = bool(reply_data.get("follow_thread_author", False))
-    block_thread_author = bool(reply_data.get("block_thread_author", False))
-
-    if not should_reply or not reply_content:
-        service.memory.add_memory(
-            "browsed",
-            f"我逛论坛时读完帖子ID:{thread_id} 后决定不回复。",
-            metadata={"thread_id": thread_id, "category": category},
-        )
-        await _apply_autonomous_social_actions(
-            service,
-            enabled=social_actions_enabled,
-            scene="定时逛帖",
-            like_enabled=should_like,
-            like_target_type="thread",
-            like_target_id=thread_id,
-            follow_enabled=follow_thread_author and follow_actions_enabled,
-            follow_user_id=thread_author_id,
-            block_enabled=block_thread_author and block_actions_enabled,
-            block_user_id=thread_author_id,
-        )
-        return
-
-    post = await service.client.reply_thread(thread_id=thread_id, content=reply_content)
-    if "error" in post:
-        service.last_error = str(post.get("error"))
-        service.memory.add_memory(
-            "browsed",
-            f"我逛论坛时尝试回复帖子ID:{thread_id}但失败了：{post['error']}",
-            metadata={"thread_id": thread_id, "category": category},
-        )
-        await _apply_autonomous_social_actions(
-            service,
-            enabled=social_actions_enabled,
-            scene="定时逛帖",
-            like_enabled=should_like,
-            like_target_type="thread",
-            like_target_id=thread_id,
-            follow_enabled=follow_thread_author and follow_actions_enabled,
-            follow_user_id=thread_author_id,
-            block_enabled=block_thread_author and block_actions_enabled,
-            block_user_id=thread_author_id,
-        )
-        return
-
-    service.memory.add_memory(
-        "replied",
-        f"我逛论坛时在帖子ID:{thread_id} 回复了一段内容：{_truncate(reply_content, 60)}",
-        metadata={"thread_id": thread_id, "category": category},
-    )
-    await _apply_autonomous_social_actions(
+    await _apply_browse_reply_decision(
         service,
-        enabled=social_actions_enabled,
-        scene="定时逛帖",
-        like_enabled=should_like,
-        like_target_type="thread",
-        like_target_id=thread_id,
-        follow_enabled=follow_thread_author and follow_actions_enabled,
-        follow_user_id=thread_author_id,
-        block_enabled=block_thread_author and block_actions_enabled,
-        block_user_id=thread_author_id,
+        reply_data,
+        thread_id=thread_id,
+        category=category,
+        fallback_diary=diary,
+        thread_author_id=thread_author_id,
+        social_actions_enabled=social_actions_enabled,
+        follow_actions_enabled=follow_actions_enabled,
+        block_actions_enabled=block_actions_enabled,
     )
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
 import asyncio
+import json
 from dataclasses import dataclass
 from typing import Any
 
 import aiohttp
 
+try:
+    import orjson
+
+    _fast_json_loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json is the fallback.
+    _fast_json_loads = json.loads
+
+# read_threads_bulk fan-out cap (well under the connector limit).
+_BULK_READ_CONCURRENCY = 8
+
 
 @dataclass(frozen=True, slots=True)
 class AstrBookClientConfig:
@@ -20,13 +31,24 @@ class AstrBookClient:
     def __init__(self, config: AstrBookClientConfig):
         self._api_base = (config.api_base or "").rstrip("/")
         self._token = config.token or ""
+        self._token_configured = bool(self._token.strip())
         self._timeout_sec = int(config.timeout_sec or 40)
+        self._headers = self._build_headers()
         self._session: aiohttp.ClientSession | None = None
+        self._inflight_gets: dict[tuple, asyncio.Future] = {}
+        # Bumped after every successful create/delete so cached thread lookups can tell they are stale.
+        self._thread_list_version = 0
 
     def configure(self, config: AstrBookClientConfig) -> None:
         self._api_base = (config.api_base or "").rstrip("/")
         self._token = config.token or ""
+        self._token_configured = bool(self._token.strip())
         self._timeout_sec = int(config.timeout_sec or 40)
+        self._headers = self._build_headers()
+
+    @property
+    def thread_list_version(self) -> int:
+        return self._thread_list_version
 
     @property
     def api_base(self) -> str:
@@ -34,15 +56,19 @@ class AstrBookClient:
 
     @property
     def token_configured(self) -> bool:
-        return bool(self._token.strip())
+        return self._token_configured
 
-    def _get_headers(self) -> dict[str, str]:
+    def _build_headers(self) -> dict[str, str]:
         return {
             "Authorization": f"Bearer {self._token}",
             "Content-Type": "application/json",
             "Accept-Encoding": "gzip, deflate",
         }
 
+    def _get_headers(self) -> dict[str, str]:
+        # Built once per configure(); aiohttp only reads the mapping.
+        return self._headers
+
     async def close(self) -> None:
         if self._session and not self._session.closed:
             await self._session.close()
@@ -51,8 +77,10 @@ class AstrBookClient:
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session and not self._session.closed:
             return self._session
-        timeout = aiohttp.ClientTimeout(total=self._timeout_sec)
-        self._session = aiohttp.ClientSession(timeout=timeout)
+        # One pooled session per client: keep connections alive between the (bursty) API calls.
+        # Timeouts are passed per request so a config reload never has to rebuild (and abort) the session.
+        connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=75)
+        self._session = aiohttp.ClientSession(connector=connector)
         return self._session
 
     async def _make_request(
@@ -63,18 +91,40 @@ class AstrBookClient:
         if not self._api_base:
             return {"error": "api_base not configured. Please set 'astrbook.api_base' in plugin config."}
 
+        if method != "GET":
+            return await self._send_request(method, endpoint, params=params, data=data)
+
+        # Identical concurrent GETs (e.g. scheduler + command) share one in-flight request.
+        key = (self._api_base, endpoint, tuple(sorted((params or {}).items())))
+        fut = self._inflight_gets.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self._send_request(method, endpoint, params=params))
+            self._inflight_gets[key] = fut
+
+            def _forget(done: asyncio.Future, key: tuple = key) -> None:
+                if self._inflight_gets.get(key) is done:
+                    del self._inflight_gets[key]
+
+            fut.add_done_callback(_forget)
+        # Shield so one cancelled waiter does not cancel the request for the others.
+        return await asyncio.shield(fut)
+
+    async def _send_request(
+        self, method: str, endpoint: str, params: dict[str, Any] | None = None, data: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
         url = f"{self._api_base}{endpoint}"
         session = await self._get_session()
+        timeout = aiohttp.ClientTimeout(total=self._timeout_sec)
 
         try:
             if method == "GET":
-                async with session.get(url, headers=self._get_headers(), params=params) as resp:
+                async with session.get(url, headers=self._get_headers(), params=params, timeout=timeout) as resp:
                     return await self._parse_response(resp)
             if method == "POST":
-                async with session.post(url, headers=self._get_headers(), json=data) as resp:
+                async with session.post(url, headers=self._get_headers(), json=data, timeout=timeout) as resp:
                     return await self._parse_response(resp)
             if method == "DELETE":
-                async with session.delete(url, headers=self._get_headers()) as resp:
+                async with session.delete(url, headers=self._get_headers(), timeout=timeout) as resp:
                     return await self._parse_response(resp)
             return {"error": f"Unsupported method: {method}"}
         except asyncio.TimeoutError:
@@ -88,11 +138,12 @@ class AstrBookClient:
 
     async def _parse_response(self, resp: aiohttp.ClientResponse) -> dict[str, Any]:
         if resp.status == 200:
-            content_type = resp.headers.get("content-type", "")
-            if "text/plain" in content_type:
+            # content_type is parsed once by aiohttp (mime type only, parameters stripped).
+            if resp.content_type == "text/plain":
                 return {"text": await resp.text()}
             try:
-                return await resp.json()
+                # Decode the raw body directly (orjson when available); no intermediate str.
+                return _fast_json_loads(await resp.read())
             except Exception:
                 return {"text": await resp.text()}
 
@@ -136,12 +187,26 @@ class AstrBookClient:
             params={"page": page, "page_size": 20, "format": "text"},
         )
 
+    async def read_threads_bulk(self, thread_ids: list[int], page: int = 1) -> list[dict[str, Any]]:
+        """Read several threads concurrently (bounded); results follow the order of `thread_ids`."""
+
+        sem = asyncio.Semaphore(_BULK_READ_CONCURRENCY)
+
+        async def _read(thread_id: int) -> dict[str, Any]:
+            async with sem:
+                return await self.read_thread(thread_id=thread_id, page=page)
+
+        return list(await asyncio.gather(*(_read(thread_id) for thread_id in thread_ids)))
+
     async def create_thread(self, title: str, content: str, category: str = "chat") -> dict[str, Any]:
-        return await self._make_request(
+        result = await self._make_request(
             "POST",
             "/api/threads",
             data={"title": title, "content": content, "category": category},
         )
+        if "error" not in result:
+            self._thread_list_version += 1
+        return result
 
     async def reply_thread(self, thread_id: int, content: str) -> dict[str, Any]:
         return await self._make_request("POST", f"/api/threads/{thread_id}/replies", data={"content": content})
@@ -169,7 +234,10 @@ class AstrBookClient:
         return await self._make_request("POST", "/api/notifications/read-all", data={})
 
     async def delete_thread(self, thread_id: int) -> dict[str, Any]:
-        return await self._make_request("DELETE", f"/api/threads/{thread_id}")
+        result = await self._make_request("DELETE", f"/api/threads/{thread_id}")
+        if "error" not in result:
+            self._thread_list_version += 1
+        return result
 
     async def delete_reply(self, reply_id: int) -> dict[str, Any]:
         return await self._make_request("DELETE", f"/api/replies/{reply_id}")
@@ -241,26 +309,26 @@ class AstrBookClient:
         timeout = aiohttp.ClientTimeout(total=max(self._timeout_sec, 60))
 
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(screenshot_url, headers=self._get_headers()) as resp:
-                    if resp.status == 200:
-                        return {
-                            "image_bytes": await resp.read(),
-                            "share_link": share_link,
-                            "thread_id": thread_id,
-                        }
-                    if resp.status == 404:
-                        return {"error": f"帖子 {thread_id} 不存在", "status": 404, "share_link": share_link}
-                    if resp.status == 503:
-                        return {"error": "截图服务暂不可用", "status": 503, "share_link": share_link}
-
-                    text = await resp.text()
-                    snippet = text[:200] if text else "No response"
+            session = await self._get_session()
+            async with session.get(screenshot_url, headers=self._get_headers(), timeout=timeout) as resp:
+                if resp.status == 200:
                     return {
-                        "error": f"截图失败 ({resp.status}) - {snippet}",
-                        "status": resp.status,
+                        "image_bytes": await resp.read(),
                         "share_link": share_link,
+                        "thread_id": thread_id,
                     }
+                if resp.status == 404:
+                    return {"error": f"帖子 {thread_id} 不存在", "status": 404, "share_link": share_link}
+                if resp.status == 503:
+                    return {"error": "截图服务暂不可用", "status": 503, "share_link": share_link}
+
+                text = await resp.text()
+                snippet = text[:200] if text else "No response"
+                return {
+                    "error": f"截图失败 ({resp.status}) - {snippet}",
+                    "status": resp.status,
+                    "share_link": share_link,
+                }
         except asyncio.TimeoutError:
             return {"error": "截图超时", "share_link": share_link}
         except aiohttp.ClientConnectorError:
@@ -1,12 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+
+try:
+    import orjson
+
+    def _fast_json_dumps(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+except ImportError:  # orjson is optional; stdlib json is the fallback.
+    _fast_json_dumps = None
+
+# Bursts of add_memory calls inside this window are persisted with a single file write.
+_SAVE_DELAY_SEC = 1.0
 
 
 @dataclass(frozen=True, slots=True)
@@ -46,16 +62,27 @@ class MemoryItem:
         )
 
 
+def _memory_timestamp(item: MemoryItem) -> float:
+    return item.timestamp
+
+
 class ForumMemory:
     """Cross-session memory storage for AstrBook activities.
 
     Persisted as JSON to disk, designed to be consumed by LLM tools and humans.
+    Inside an event loop, writes are deferred by `_SAVE_DELAY_SEC` and run on a background writer
+    thread; call `close()` (off the loop) before shutdown so pending changes reach the disk.
     """
 
     def __init__(self, max_items: int = 50, storage_path: Path | str = "data/astrbook/forum_memory.json") -> None:
         self._max_items = max(1, int(max_items))
         self._storage_path = Path(storage_path)
         self._memories: list[MemoryItem] = []
+        # notification_id -> number of retained memories carrying it (kept in sync with _memories).
+        self._notification_id_counts: dict[int, int] = {}
+        self._save_handle: asyncio.TimerHandle | None = None
+        # Single worker keeps background writes in submission order; created lazily, released by close().
+        self._writer: ThreadPoolExecutor | None = None
 
         os.makedirs(self._storage_path.parent, exist_ok=True)
         self._load()
@@ -79,6 +106,8 @@ class ForumMemory:
         if storage_path is not None:
             new_path = Path(storage_path)
             if new_path != self._storage_path:
+                # Queues the pending save without blocking; the write keeps targeting the old file.
+                self.flush()
                 self._storage_path = new_path
                 changed_path = True
             os.makedirs(self._storage_path.parent, exist_ok=True)
@@ -90,8 +119,40 @@ class ForumMemory:
     def add_memory(self, memory_type: str, content: str, metadata: dict[str, Any] | None = None) -> None:
         item = MemoryItem(memory_type=memory_type, content=content, metadata=metadata or {})
         self._memories.append(item)
+        self._index_notification_id(item, 1)
         self._trim()
-        self._save()
+        self._schedule_save()
+
+    def add_memories(self, entries: Iterable[tuple[str, str, dict[str, Any] | None]]) -> int:
+        """Append several (memory_type, content, metadata) entries and persist once."""
+        count = 0
+        for memory_type, content, metadata in entries:
+            item = MemoryItem(memory_type=memory_type, content=content, metadata=metadata or {})
+            self._memories.append(item)
+            self._index_notification_id(item, 1)
+            count += 1
+        if count:
+            self._trim()
+            self._schedule_save()
+        return count
+
+    def flush(self) -> None:
+        """Hand a pending deferred save to the writer thread now (does not wait for the disk)."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+            self._save_in_background()
+
+    def close(self) -> None:
+        """Flush, wait for queued writes and stop the writer thread.
+
+        Blocks on disk I/O, so async callers should `flush()` on the loop and then run this via `asyncio.to_thread`.
+        A later save simply starts a new writer.
+        """
+        self.flush()
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
 
     def add_diary(self, content: str, metadata: dict[str, Any] | None = None) -> None:
         meta = {"is_agent_summary": True, "char_count": len(content)}
@@ -100,13 +161,16 @@ class ForumMemory:
         self.add_memory("diary", content, meta)
 
     def get_memories(self, memory_type: str | None = None, limit: int | None = None) -> list[MemoryItem]:
-        items = self._memories
+        items: Iterable[MemoryItem] = reversed(self._memories)  # newest first
         if memory_type:
-            items = [m for m in items if m.memory_type == memory_type]
-        items = list(reversed(items))  # newest first
+            items = (m for m in items if m.memory_type == memory_type)
         if limit is not None:
-            items = items[: max(0, int(limit))]
-        return items
+            return list(islice(items, max(0, int(limit))))
+        return list(items)
+
+    def known_notification_ids(self) -> set[int]:
+        """Return notification ids referenced by retained memories (a fresh set the caller may modify)."""
+        return set(self._notification_id_counts)
 
     def get_summary(self, limit: int = 10) -> str:
         items = self.get_memories(limit=limit)
@@ -121,12 +185,11 @@ class ForumMemory:
 
     def get_recent_thread_ids(self, window_sec: int) -> set[int]:
         """Return thread_ids appeared in memories within a time window."""
-        now = time.time()
-        window = max(0, int(window_sec))
+        cutoff = time.time() - max(0, int(window_sec))
+        # Memories are appended in time order, so the window is a suffix found in O(log N).
+        start = bisect_left(self._memories, cutoff, key=_memory_timestamp)
         ret: set[int] = set()
-        for m in reversed(self._memories):  # newest -> oldest
-            if now - m.timestamp > window:
-                break
+        for m in islice(self._memories, start, None):
             thread_id = m.metadata.get("thread_id")
             if isinstance(thread_id, int):
                 ret.add(thread_id)
@@ -139,19 +202,27 @@ class ForumMemory:
         if not self._memories:
             return "我还没有逛过论坛，没有可以回忆的经历。"
 
-        diaries = [m for m in self._memories if m.memory_type == "diary"]
-        other_memories = [m for m in self._memories if m.memory_type != "diary"]
+        # Single newest-first pass; other memories only fill the slots diaries leave, so neither list exceeds limit.
+        diaries: list[MemoryItem] = []
+        other_memories: list[MemoryItem] = []
+        for m in reversed(self._memories):
+            if m.memory_type == "diary":
+                diaries.append(m)
+                if len(diaries) >= limit:
+                    break
+            elif len(other_memories) < limit:
+                other_memories.append(m)
 
         lines: list[str] = ["📔 我在 AstrBook 论坛的回忆：", ""]
 
         if diaries:
             lines.append("【我的日记】")
-            for item in list(reversed(diaries))[:limit]:
+            for item in diaries:
                 date_str = datetime.fromtimestamp(item.timestamp).strftime("%Y-%m-%d")
                 lines.append(f"  📝 [{date_str}] {item.content}")
             lines.append("")
 
-        remaining = limit - min(limit, len(diaries))
+        remaining = limit - len(diaries)
         if remaining > 0 and other_memories:
             lines.append("【最近动态】")
             emojis = {
@@ -162,7 +233,7 @@ class ForumMemory:
                 "created": "✍️",
                 "auto_reply": "🤖",
             }
-            for item in list(reversed(other_memories))[:remaining]:
+            for item in other_memories[:remaining]:
                 lines.append(f"  {emojis.get(item.memory_type, '📌')} {item.content}")
 
         if len(lines) <= 2:
@@ -171,12 +242,26 @@ class ForumMemory:
 
     # ==================== internal ====================
 
+    def _index_notification_id(self, item: MemoryItem, delta: int) -> None:
+        nid = item.metadata.get("notification_id")
+        if type(nid) is not int:
+            return
+        count = self._notification_id_counts.get(nid, 0) + delta
+        if count > 0:
+            self._notification_id_counts[nid] = count
+        else:
+            self._notification_id_counts.pop(nid, None)
+
     def _trim(self) -> None:
-        if len(self._memories) > self._max_items:
-            self._memories = self._memories[-self._max_items :]
+        overflow = len(self._memories) - self._max_items
+        if overflow > 0:
+            for item in self._memories[:overflow]:
+                self._index_notification_id(item, -1)
+            self._memories = self._memories[overflow:]
 
     def _load(self) -> None:
         self._memories = []
+        self._notification_id_counts = {}
         if not self._storage_path.exists():
             return
         try:
@@ -185,18 +270,51 @@ class ForumMemory:
                 return
             for item in raw:
                 if isinstance(item, dict):
-                    self._memories.append(MemoryItem.from_dict(item))
+                    memory = MemoryItem.from_dict(item)
+                    self._memories.append(memory)
+                    self._index_notification_id(memory, 1)
             self._trim()
         except Exception:
             # If corrupted, rebuild an empty file to avoid cascading errors.
             self._memories = []
+            self._notification_id_counts = {}
             self._save()
 
+    def _schedule_save(self) -> None:
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. sync tooling): persist immediately.
+            self._save()
+            return
+        self._save_handle = loop.call_later(_SAVE_DELAY_SEC, self._on_save_timer)
+
+    def _on_save_timer(self) -> None:
+        self._save_handle = None
+        self._save_in_background()
+
+    def _save_in_background(self) -> None:
+        # Snapshot on the loop thread; serialize and write on the writer thread so the loop never blocks on disk.
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="astrbook-memory")
+        self._writer.submit(self._write, self._storage_path, [m.to_dict() for m in self._memories])
+
     def _save(self) -> None:
+        self._write(self._storage_path, [m.to_dict() for m in self._memories])
+
+    @staticmethod
+    def _write(path: Path, data: list[dict[str, Any]]) -> None:
         try:
-            os.makedirs(self._storage_path.parent, exist_ok=True)
-            data = [m.to_dict() for m in self._memories]
-            self._storage_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.makedirs(path.parent, exist_ok=True)
+            if _fast_json_dumps is not None:
+                try:
+                    path.write_bytes(_fast_json_dumps(data))
+                    return
+                except TypeError:  # orjson.JSONEncodeError, e.g. non-str metadata keys
+                    pass
+            path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
         except Exception:
             # Avoid raising in memory subsystem; callers should not crash.
             return
@@ -32,9 +32,14 @@ def resolve_model_slot(
     4) hard fallback: replyer
     """
 
-    default_slot = _resolve_slot_name(service, "llm.default_slot", task_default_slot)
-    slot_name = _resolve_slot_name(service, task_key, default_slot)
-
+    cache_key = (task_key, task_default_slot)
+    slot_name = service.model_slot_name_cache.get(cache_key)
+    if slot_name is None:
+        default_slot = _resolve_slot_name(service, "llm.default_slot", task_default_slot)
+        slot_name = _resolve_slot_name(service, task_key, default_slot)
+        service.model_slot_name_cache[cache_key] = slot_name
+
+    # Look up the slot config every time: MaiBot may reload model_config independently.
     slot_cfg = getattr(model_config.model_task_config, slot_name, None)
     if slot_cfg is not None:
         return slot_name, slot_cfg
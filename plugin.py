@@ -113,7 +113,7 @@ class AstrBookForumPlugin(BasePlugin):
 
     config_schema: dict = {
         "plugin": {
-            "config_version": ConfigField(type=str, default="1.0.13", description="配置文件版本"),
+            "config_version": ConfigField(type=str, default="1.0.14", description="配置文件版本"),
             "enabled": ConfigField(type=bool, default=False, description="是否启用插件"),
         },
         "astrbook": {
@@ -235,6 +235,11 @@ class AstrBookForumPlugin(BasePlugin):
             "skip_threads_window_sec": ConfigField(
                 type=int, default=86400, description="跳过最近参与帖子的窗口（秒）", min=0
             ),
+            "single_pass": ConfigField(
+                type=bool,
+                default=False,
+                description="是否合并逛帖两阶段：预读若干候选帖后一次 LLM 调用完成选帖与回复（默认关闭）",
+            ),
         },
         "posting": {
             "enabled": ConfigField(type=bool, default=False, description="是否启用定时主动发帖（默认关闭）"),
@@ -388,6 +393,7 @@ class AstrBookForumPlugin(BasePlugin):
         - v1.0.10 -> v1.0.11: add auto-mark-read and notification memory controls
         - v1.0.11 -> v1.0.12: add follow/profile actions and new_post defaults
         - v1.0.12 -> v1.0.13: add autonomous follow switches for realtime and browse
+        - v1.0.13 -> v1.0.14: add browse.single_pass (prefetch threads and decide in one LLM call)
         """
 
         migrated = super()._migrate_config_values(old_config, new_config)
@@ -8,6 +8,7 @@ _EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
 _URL_RE = re.compile(r"\bhttps?://\S+\b", re.IGNORECASE)
 _LONG_DIGITS_RE = re.compile(r"\b\d{6,}\b")
 _MENTION_RE = re.compile(r"@[^\s]+")
+_INLINE_SPACES_RE = re.compile(r"[ \t]+")
 
 
 def sanitize_forum_text(text: str, *, allow_urls: bool, allow_mentions: bool) -> str:
@@ -27,7 +28,7 @@ def sanitize_forum_text(text: str, *, allow_urls: bool, allow_mentions: bool) ->
         out = _MENTION_RE.sub("<MENTION>", out)
 
     # Normalize whitespace a bit.
-    out = re.sub(r"[ \t]+", " ", out).strip()
+    out = _INLINE_SPACES_RE.sub(" ", out).strip()
     return out
 
 
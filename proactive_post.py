@@ -3,12 +3,20 @@ from __future__ import annotations
 import hashlib
 import json
 import random
+import re
 import time
 from dataclasses import dataclass
 from typing import Any, Iterable, Literal
 
 from json_repair import repair_json
 
+try:
+    import orjson
+
+    _fast_json_loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json is the fallback.
+    _fast_json_loads = json.loads
+
 from src.chat.message_receive.chat_stream import ChatStream, get_chat_manager
 from src.chat.utils.chat_message_builder import build_readable_messages, get_raw_msg_before_timestamp_with_chat
 from src.common.database.database_model import ChatStreams
@@ -23,7 +31,7 @@ from .model_slots import resolve_model_slot
 from .posting_policy import sanitize_forum_text
 from .prompting import build_forum_persona_block
 from .service import AstrBookService
-from .tools import VALID_CATEGORIES
+from .tools import VALID_CATEGORIES, VALID_CATEGORY_SET
 
 logger = get_logger("astrbook_forum_proactive_post")
 
@@ -38,13 +46,23 @@ def _truncate(text: str, max_chars: int) -> str:
     return text[: max_chars - 1] + "…"
 
 
+_JSON_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL | re.IGNORECASE)
+
+
 def _parse_json_object(text: str) -> dict[str, Any] | None:
+    if not text:
+        return None
+    # Strict parsing first (minus a surrounding code fence); repair_json is only needed for malformed output.
+    m = _JSON_FENCE_RE.match(text)
     try:
-        fixed = repair_json(text)
-        data = json.loads(fixed)
-        return data if isinstance(data, dict) else None
+        data = _fast_json_loads(m.group(1) if m else text)
     except Exception:
-        return None
+        try:
+            # Repair and decode in one pass; the strict parse above already failed.
+            data = repair_json(text, return_objects=True, skip_json_loads=True)
+        except Exception:
+            return None
+    return data if isinstance(data, dict) else None
 
 
 def _stable_hash(text: str) -> str:
@@ -287,7 +305,7 @@ async def proactive_post_once(
         )
 
     allowed_categories = service.get_config_list_str("posting.categories_allowlist")
-    allowed_categories = [c for c in allowed_categories if c in VALID_CATEGORIES]
+    allowed_categories = [c for c in allowed_categories if c in VALID_CATEGORY_SET]
     if not allowed_categories:
         allowed_categories = list(VALID_CATEGORIES)
 
@@ -304,8 +322,7 @@ async def proactive_post_once(
     chat_history = sanitize_forum_text(chat_history, allow_urls=False, allow_mentions=False)
     memory_hint = sanitize_forum_text(memory_hint, allow_urls=False, allow_mentions=False)
 
-    prompt = f"""
-{persona_block}
+    prompt = f"""{persona_block}
 {profile_block}
 
 你将代表 MaiBot 在 AstrBook 论坛发布一个新的主题帖子。
@@ -332,8 +349,7 @@ async def proactive_post_once(
 字段要求：
 - should_post=false 时，其它字段可以为空字符串
 - title 需要 2-100 字符
-- content 至少 50 字符，最多 1200 字符左右
-""".strip()
+- content 至少 50 字符，最多 1200 字符左右"""
 
     temperature = service.get_config_float("posting.temperature", default=0.7, min_value=0.0, max_value=2.0)
     max_tokens = service.get_config_int("posting.max_tokens", default=8192, min_value=64, max_value=8192)
@@ -86,11 +86,15 @@ def build_forum_profile_block(profile: dict | None, *, stale_hint: str | None =
     )
 
 
+_CODE_FENCE_OPEN_RE = re.compile(r"^```[a-zA-Z0-9_-]*\n?")
+_CODE_FENCE_CLOSE_RE = re.compile(r"\n?```$")
+
+
 def _strip_code_fences(text: str) -> str:
     stripped = text.strip()
     if stripped.startswith("```"):
-        stripped = re.sub(r"^```[a-zA-Z0-9_-]*\\n?", "", stripped)
-        stripped = re.sub(r"\\n?```$", "", stripped)
+        stripped = _CODE_FENCE_OPEN_RE.sub("", stripped)
+        stripped = _CODE_FENCE_CLOSE_RE.sub("", stripped)
     return stripped.strip()
 
 
@@ -5,10 +5,19 @@ import json
 import random
 import time
 from collections import deque
-from typing import TYPE_CHECKING, Any
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator
 
 import aiohttp
 
+try:
+    import orjson
+
+    _fast_json_loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json is the fallback.
+    _fast_json_loads = json.loads
+
 from src.common.logger import get_logger
 
 from .client import AstrBookClient, AstrBookClientConfig
@@ -23,6 +32,30 @@ if TYPE_CHECKING:
 
 _service_instance: "AstrBookService | None" = None
 
+_AUTO_REPLY_LLM_CONCURRENCY = 4
+
+# notification type -> (memory type, memory text template)
+_NOTIFICATION_MEMORY_TEMPLATES: dict[str, tuple[str, str]] = {
+    "mention": ("mentioned", "我在《{title}》中被 @{user} 提及: {preview}..."),
+    "reply": ("replied", "@{user} 在《{title}》回复了我: {preview}..."),
+    "sub_reply": ("replied", "@{user} 在《{title}》回复了我: {preview}..."),
+    "new_post": ("followed_new_post", "我关注的 @{user} 发布了新帖《{title}》: {preview}..."),
+    "follow": ("followed_by_user", "@{user} 关注了我。"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ForumNotification:
+    """A realtime notification, normalized once at the SSE boundary for auto-reply."""
+
+    msg_type: str
+    thread_id: int
+    thread_title: str
+    from_user_id: int | None
+    from_username: str
+    content: str
+    reply_id: int | None = None
+
 
 def set_astrbook_service(service: "AstrBookService | None") -> None:
     global _service_instance
@@ -65,9 +98,13 @@ class AstrBookService:
         self._bg_tasks: set[asyncio.Task] = set()
 
         self._recent_reply_ids: dict[int, float] = {}
+        # Dedupe for notifications without a reply_id: (type, thread_id, from_user_id, content hash) -> ts.
+        self._recent_notification_keys: dict[tuple[str, int, Any, int], float] = {}
         self._auto_reply_timestamps: deque[float] = deque(maxlen=200)
 
         self._post_lock = asyncio.Lock()
+        # Caps concurrent auto-reply LLM calls so notification bursts queue instead of tripping provider limits.
+        self.auto_reply_llm_semaphore = asyncio.Semaphore(_AUTO_REPLY_LLM_CONCURRENCY)
 
         self.post_rate_limiter = PostRateLimiter(
             max_posts_per_day=self.get_config_int("posting.max_posts_per_day", default=1, min_value=0, max_value=100),
@@ -77,6 +114,11 @@ class AstrBookService:
             ),
         )
         self.recent_post_hashes: dict[str, float] = {}
+        # (task_key, task_default_slot) -> configured slot name; cleared on config reload.
+        self.model_slot_name_cache: dict[tuple[str, str], str] = {}
+
+        # thread_id -> (lock, number of holders/waiters); entries are dropped once unused.
+        self._thread_reply_locks: dict[int, tuple[asyncio.Lock, list[int]]] = {}
 
         self._profile_cache: dict[str, Any] | None = None
         self._profile_cache_ts: float = 0.0
@@ -84,6 +126,7 @@ class AstrBookService:
 
     def update_config(self, config: dict[str, Any] | None) -> None:
         self.config = config or {}
+        self.model_slot_name_cache.clear()
         self.client.configure(self._build_client_config())
         self.memory.configure(
             max_items=self.get_config_int("memory.max_items", default=50, min_value=1, max_value=5000),
@@ -149,6 +192,9 @@ class AstrBookService:
         self._sse_session = None
 
         await self.client.close()
+        # Cancel the save timer on the loop thread, then wait for the disk write off the loop.
+        self.memory.flush()
+        await asyncio.to_thread(self.memory.close)
 
         logger.info("[AstrBook] Service stopped")
 
@@ -239,6 +285,24 @@ class AstrBookService:
         except Exception:
             return ""
 
+    @asynccontextmanager
+    async def thread_reply_lock(self, thread_id: int) -> AsyncIterator[None]:
+        """Serialize auto-replies within one thread while other threads proceed in parallel."""
+
+        entry = self._thread_reply_locks.get(thread_id)
+        if entry is None:
+            entry = (asyncio.Lock(), [0])
+            self._thread_reply_locks[thread_id] = entry
+        lock, users = entry
+        users[0] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            users[0] -= 1
+            if users[0] == 0 and self._thread_reply_locks.get(thread_id) is entry:
+                del self._thread_reply_locks[thread_id]
+
     # ==================== SSE ====================
 
     async def _sse_loop(self) -> None:
@@ -374,8 +438,8 @@ class AstrBookService:
             return
 
         try:
-            payload = json.loads(payload_text)
-        except json.JSONDecodeError:
+            payload = _fast_json_loads(payload_text)
+        except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
             logger.debug(
                 "[AstrBook] ignore non-json sse payload event=%s data=%s",
                 event_type or "message",
@@ -429,8 +493,37 @@ class AstrBookService:
         notification_id: int | None = None,
         is_read: bool | None = None,
     ) -> None:
-        if notif_type not in {"mention", "reply", "sub_reply", "new_post", "follow"}:
-            return
+        entry = self._build_notification_memory(
+            notif_type=notif_type,
+            thread_id=thread_id,
+            thread_title=thread_title,
+            from_username=from_username,
+            preview=preview,
+            reply_id=reply_id,
+            notification_id=notification_id,
+            is_read=is_read,
+        )
+        if entry is not None:
+            self.memory.add_memory(*entry)
+
+    @staticmethod
+    def _build_notification_memory(
+        *,
+        notif_type: str,
+        thread_id: int | None,
+        thread_title: str,
+        from_username: str,
+        preview: str,
+        reply_id: int | None = None,
+        notification_id: int | None = None,
+        is_read: bool | None = None,
+    ) -> tuple[str, str, dict[str, Any]] | None:
+        template = _NOTIFICATION_MEMORY_TEMPLATES.get(notif_type)
+        if template is None:
+            return None
+        # Everything except "follow" is about a thread and needs its id.
+        if notif_type != "follow" and not isinstance(thread_id, int):
+            return None
 
         metadata: dict[str, Any] = {
             "from_user": from_username,
@@ -446,37 +539,11 @@ class AstrBookService:
         if is_read is not None:
             metadata["is_read"] = bool(is_read)
 
-        if notif_type == "follow":
-            self.memory.add_memory(
-                "followed_by_user",
-                f"@{from_username} 关注了我。",
-                metadata=metadata,
-            )
-            return
-
-        if not isinstance(thread_id, int):
-            return
-
-        if notif_type == "mention":
-            self.memory.add_memory(
-                "mentioned",
-                f"我在《{thread_title}》中被 @{from_username} 提及: {preview[:50]}...",
-                metadata=metadata,
-            )
-            return
-
-        if notif_type == "new_post":
-            self.memory.add_memory(
-                "followed_new_post",
-                f"我关注的 @{from_username} 发布了新帖《{thread_title}》: {preview[:50]}...",
-                metadata=metadata,
-            )
-            return
-
-        self.memory.add_memory(
-            "replied",
-            f"@{from_username} 在《{thread_title}》回复了我: {preview[:50]}...",
-            metadata=metadata,
+        memory_type, text_template = template
+        return (
+            memory_type,
+            text_template.format(user=from_username, title=thread_title, preview=preview[:50]),
+            metadata,
         )
 
     def record_notifications_snapshot(self, items: Any) -> int:
@@ -485,12 +552,9 @@ class AstrBookService:
         if not isinstance(items, list):
             return 0
 
-        existing_notification_ids = {
-            m.metadata.get("notification_id")
-            for m in self.memory.get_memories(limit=self.memory.max_items)
-            if isinstance(m.metadata.get("notification_id"), int)
-        }
+        existing_notification_ids = self.memory.known_notification_ids()
 
+        entries: list[tuple[str, str, dict[str, Any]]] = []
         added = 0
         for item in items:
             if not isinstance(item, dict):
@@ -503,17 +567,23 @@ class AstrBookService:
                 existing_notification_ids.add(notif_id)
 
             notif_type = str(item.get("type", "") or "")
-            if notif_type not in {"mention", "reply", "sub_reply", "new_post", "follow"}:
+            if notif_type not in _NOTIFICATION_MEMORY_TEMPLATES:
                 continue
 
-            thread_id = item.get("thread_id") if isinstance(item.get("thread_id"), int) else None
-            from_user = item.get("from_user", {}) if isinstance(item.get("from_user"), dict) else {}
+            thread_id = item.get("thread_id")
+            if not isinstance(thread_id, int):
+                thread_id = None
+            from_user = item.get("from_user")
+            if not isinstance(from_user, dict):
+                from_user = {}
             username = str(from_user.get("username") or item.get("from_username") or item.get("author") or "unknown")
             thread_title = str(item.get("thread_title", "") or "")
-            reply_id = item.get("reply_id") if isinstance(item.get("reply_id"), int) else None
+            reply_id = item.get("reply_id")
+            if not isinstance(reply_id, int):
+                reply_id = None
             preview = str(item.get("content_preview") or item.get("content") or "")
 
-            self._record_notification_event(
+            entry = self._build_notification_memory(
                 notif_type=notif_type,
                 thread_id=thread_id,
                 thread_title=thread_title,
@@ -523,8 +593,13 @@ class AstrBookService:
                 notification_id=notif_id if isinstance(notif_id, int) else None,
                 is_read=bool(item.get("is_read")),
             )
+            if entry is not None:
+                entries.append(entry)
             added += 1
 
+        # One trim + one file write for the whole snapshot instead of one per notification.
+        self.memory.add_memories(entries)
+
         return added
 
     async def maybe_mark_notifications_read(self, *, reason: str, force: bool = False) -> bool:
@@ -605,18 +680,28 @@ class AstrBookService:
         if msg_type not in reply_types:
             return
 
+        # A reply with no text gives the model nothing to answer; skip before spending an LLM call.
+        if msg_type in ("reply", "sub_reply") and not content.strip():
+            return
+
         # Self-avoid.
         if isinstance(from_user_id, int) and self.bot_user_id and from_user_id == self.bot_user_id:
             return
 
-        # Dedupe (reply_id based).
+        # Dedupe (reply_id based; content based when the event carries no reply_id).
         dedupe_window = self.get_config_int(
             "realtime.dedupe_window_sec", default=3600, min_value=0, max_value=86400 * 30
         )
+        self._cleanup_recent_reply_ids(now=now, window_sec=dedupe_window)
+        notification_key: tuple[str, int, Any, int] | None = None
         if isinstance(reply_id, int):
-            self._cleanup_recent_reply_ids(now=now, window_sec=dedupe_window)
             if reply_id in self._recent_reply_ids and now - self._recent_reply_ids[reply_id] < dedupe_window:
                 return
+        else:
+            notification_key = (msg_type, thread_id, from_user_id, hash(content[:128]))
+            seen_ts = self._recent_notification_keys.get(notification_key)
+            if seen_ts is not None and now - seen_ts < dedupe_window:
+                return
 
         # Rate limit.
         max_per_min = self.get_config_int("realtime.max_auto_replies_per_minute", default=3, min_value=0, max_value=60)
@@ -636,6 +721,8 @@ class AstrBookService:
         self._auto_reply_timestamps.append(now)
         if isinstance(reply_id, int):
             self._recent_reply_ids[reply_id] = now
+        elif notification_key is not None:
+            self._recent_notification_keys[notification_key] = now
 
         # Fire-and-forget auto reply.
         from .auto_reply import auto_reply_notification  # lazy import (avoid circular)
@@ -643,15 +730,15 @@ class AstrBookService:
         task = self._create_task(
             auto_reply_notification(
                 self,
-                {
-                    "type": msg_type,
-                    "thread_id": thread_id,
-                    "thread_title": thread_title,
-                    "from_user_id": from_user_id,
-                    "from_username": from_username,
-                    "content": content,
-                    "reply_id": reply_id,
-                },
+                ForumNotification(
+                    msg_type=msg_type,
+                    thread_id=thread_id,
+                    thread_title=thread_title,
+                    from_user_id=from_user_id if isinstance(from_user_id, int) else None,
+                    from_username=from_username,
+                    content=content,
+                    reply_id=reply_id if isinstance(reply_id, int) else None,
+                ),
             ),
             name="astrbook_auto_reply",
         )
@@ -667,10 +754,14 @@ class AstrBookService:
     def _cleanup_recent_reply_ids(self, now: float, window_sec: int) -> None:
         if window_sec <= 0:
             self._recent_reply_ids.clear()
+            self._recent_notification_keys.clear()
             return
         expired = [rid for rid, ts in self._recent_reply_ids.items() if now - ts > window_sec]
         for rid in expired:
             del self._recent_reply_ids[rid]
+        expired_keys = [key for key, ts in self._recent_notification_keys.items() if now - ts > window_sec]
+        for key in expired_keys:
+            del self._recent_notification_keys[key]
 
     # ==================== Scheduled browse ====================
 
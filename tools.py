@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import base64
 from typing import Any
 
 from src.common.logger import get_logger
 from src.plugin_system import BaseTool, ToolParamType
+from src.plugin_system.apis import send_api
 
 from .client import AstrBookClient
 from .memory import ForumMemory
@@ -12,6 +14,17 @@ from .service import AstrBookService, get_astrbook_service
 logger = get_logger("astrbook_forum_tools")
 
 VALID_CATEGORIES = ["chat", "deals", "misc", "tech", "help", "intro", "acg"]
+VALID_CATEGORY_SET = frozenset(VALID_CATEGORIES)
+
+CATEGORY_DISPLAY_NAMES: dict[str, str] = {
+    "chat": "Chat",
+    "deals": "Deals",
+    "misc": "Misc",
+    "tech": "Tech",
+    "help": "Help",
+    "intro": "Intro",
+    "acg": "ACG",
+}
 
 NOTIFICATION_TYPE_LABELS: dict[str, str] = {
     "reply": "💬 Reply",
@@ -95,15 +108,11 @@ class _AstrBookTool(BaseTool):
     async def _send_text_to_chat(self, text: str) -> bool:
         if not self.chat_id:
             return False
-        from src.plugin_system.apis import send_api
-
         return await send_api.text_to_stream(text=text, stream_id=self.chat_id)
 
     async def _send_image_to_chat(self, image_base64: str) -> bool:
         if not self.chat_id:
             return False
-        from src.plugin_system.apis import send_api
-
         return await send_api.image_to_stream(image_base64=image_base64, stream_id=self.chat_id)
 
 
@@ -126,7 +135,7 @@ class BrowseThreadsTool(_AstrBookTool):
         page = int(function_args.get("page", 1) or 1)
         page_size = int(function_args.get("page_size", 10) or 10)
         category = function_args.get("category")
-        if isinstance(category, str) and category not in VALID_CATEGORIES:
+        if isinstance(category, str) and category not in VALID_CATEGORY_SET:
             category = None
 
         result = await self._get_client().browse_threads(page=page, page_size=page_size, category=category)
@@ -158,7 +167,7 @@ class SearchThreadsTool(_AstrBookTool):
         category = function_args.get("category")
         if not keyword:
             return {"name": self.name, "content": "Please provide a search keyword"}
-        if isinstance(category, str) and category not in VALID_CATEGORIES:
+        if isinstance(category, str) and category not in VALID_CATEGORY_SET:
             category = None
 
         result = await self._get_client().search_threads(keyword=keyword, page=page, category=category)
@@ -170,28 +179,23 @@ class SearchThreadsTool(_AstrBookTool):
         if not total:
             return {"name": self.name, "content": f"No threads found for '{keyword}'"}
 
-        category_names = {
-            "chat": "Chat",
-            "deals": "Deals",
-            "misc": "Misc",
-            "tech": "Tech",
-            "help": "Help",
-            "intro": "Intro",
-            "acg": "ACG",
-        }
-
         lines = [f"🔍 Search Results for '{keyword}' ({total} found):\n"]
         for item in items if isinstance(items, list) else []:
             if not isinstance(item, dict) or "id" not in item or "title" not in item:
                 continue
-            cat = category_names.get(item.get("category"), "")
-            author = item.get("author", {}) if isinstance(item.get("author"), dict) else {}
+            cat = CATEGORY_DISPLAY_NAMES.get(item.get("category"), "")
+            author = item.get("author")
+            if not isinstance(author, dict):
+                author = {}
             author_name = author.get("nickname") or author.get("username", "Unknown")
-            lines.append(f"[{item['id']}] [{cat}] {item['title']}")
-            lines.append(f"    by @{author_name} | {item.get('reply_count', 0)} replies")
-            if item.get("content_preview"):
-                lines.append(f"    {str(item['content_preview'])[:80]}...")
-            lines.append("")
+            preview = item.get("content_preview")
+            preview_line = f"    {str(preview)[:80]}...\n" if preview else ""
+            # One block per item; the trailing newline keeps the blank separator line.
+            lines.append(
+                f"[{item['id']}] [{cat}] {item['title']}\n"
+                f"    by @{author_name} | {item.get('reply_count', 0)} replies\n"
+                f"{preview_line}"
+            )
 
         if result.get("total_pages", 1) > 1:
             lines.append(
@@ -390,7 +394,7 @@ class CreateThreadTool(_AstrBookTool):
             return {"name": self.name, "content": "Title must be 2-100 characters"}
         if len(content) < 5:
             return {"name": self.name, "content": "Content must be at least 5 characters"}
-        if category not in VALID_CATEGORIES:
+        if category not in VALID_CATEGORY_SET:
             category = "chat"
 
         result = await self._get_client().create_thread(title=title, content=content, category=category)
@@ -595,8 +599,6 @@ class ShareThreadTool(_AstrBookTool):
     parameters = [("thread_id", ToolParamType.INTEGER, "要分享的帖子 ID", True, None)]
 
     async def execute(self, function_args: dict[str, Any]) -> dict[str, Any]:
-        import base64
-
         thread_id = function_args.get("thread_id")
         if not isinstance(thread_id, int):
             return {"name": self.name, "content": "thread_id must be a number"}